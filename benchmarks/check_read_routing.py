@@ -0,0 +1,59 @@
+"""Checks that read-only admin routes use the replica and honour read-your-writes.
+
+Needs a primary and a streaming replica (docker-compose.replica.yml), with
+DATABASE_URL / DATABASE_REPLICA_URL (and the other settings) in the environment:
+
+    python benchmarks/check_read_routing.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Depends  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from config import settings  # noqa: E402
+from database import PRIMARY_STICKY_COOKIE, get_read_db, replica_engine  # noqa: E402
+from main import app  # noqa: E402
+
+
+@app.get("/__routing_probe", include_in_schema=False)
+def routing_probe(db: Session = Depends(get_read_db)):
+    return {"replica": db.execute(text("SELECT pg_is_in_recovery()")).scalar()}
+
+
+def check(name: str, ok: bool) -> int:
+    print(f"{'PASS' if ok else 'FAIL'}  {name}")
+    return 0 if ok else 1
+
+
+def main() -> int:
+    if replica_engine is None:
+        print("DATABASE_REPLICA_URL is not set")
+        return 2
+    failures = 0
+    with TestClient(app) as client:
+        failures += check("plain read goes to the replica", client.get("/__routing_probe").json()["replica"])
+        failures += check("admin list route answers from the replica", client.get("/api/admin/users").status_code == 200)
+
+        # Any successful write makes the client sticky
+        response = client.post("/api/customer/register/start", json={"email": f"routing-{time.time_ns()}@example.com"})
+        failures += check("write succeeds on the primary", response.status_code == 200)
+        failures += check("write sets the sticky cookie", PRIMARY_STICKY_COOKIE in response.cookies)
+        failures += check("reads after a write stay on the primary", not client.get("/__routing_probe").json()["replica"])
+
+        client.cookies.clear()
+        failures += check("without the cookie reads go back to the replica", client.get("/__routing_probe").json()["replica"])
+
+        client.cookies.set(PRIMARY_STICKY_COOKIE, str(time.time() - 1))
+        failures += check("an expired cookie is ignored", client.get("/__routing_probe").json()["replica"])
+    print(f"sticky window: {settings.REPLICA_STICKY_SECONDS}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
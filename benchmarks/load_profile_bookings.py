@@ -0,0 +1,111 @@
+"""Concurrent load benchmark for the authenticated customer profile/booking routes.
+
+Run it against a live server before and after a change and compare the
+percentiles (requires `pip install httpx`):
+
+    python benchmarks/load_profile_bookings.py --base-url http://localhost:8000 \
+        --email john@example.com --password secret --concurrency 50 --requests 2000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+import httpx
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def free_slots(client, needed, first_day):
+    """The first `needed` open (date, time) slots from `first_day` on, so no booking call hits a 409"""
+    found = []
+    day = first_day
+    while len(found) < needed:
+        if day > first_day + timedelta(days=3650):
+            raise SystemExit(f"only {len(found)} open slots in the next ten years, {needed} needed")
+        window_end = day + timedelta(days=30)
+        response = await client.get(
+            "/api/customer/availability",
+            params={"date_from": day.isoformat(), "date_to": window_end.isoformat()},
+        )
+        response.raise_for_status()
+        for entry in response.json():
+            found.extend((entry["date"], slot["time"]) for slot in entry["slots"] if slot["available"])
+        day = window_end + timedelta(days=1)
+    return iter(found[:needed])
+
+
+async def run(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+        login = await client.post("/api/customer/login", json={"email": args.email, "password": args.password})
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        # Mostly reads, with some booking writes mixed in
+        calls = [
+            ("GET", "/api/customer/profile/me"),
+            ("GET", "/api/customer/profile/bookings"),
+            ("GET", "/api/customer/profile/documents"),
+            ("POST", "/api/customer/booking/create"),
+        ]
+        # Each booking takes its own open slot; reusing one would only measure the conflict path
+        slots = await free_slots(
+            client, args.requests // len(calls) + 1, date.today() + timedelta(days=args.days_ahead)
+        )
+
+        def booking():
+            day, slot = next(slots)
+            return {
+                "name": "Load Test",
+                "email": args.email,
+                "phone": "+10000000000",
+                "purpose": "benchmark",
+                "date": day,
+                "time": slot,
+            }
+
+        latencies = {path: [] for _, path in calls}
+        errors = 0
+        queue = asyncio.Queue()
+        for i in range(args.requests):
+            queue.put_nowait(calls[i % len(calls)])
+
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                method, path = queue.get_nowait()
+                body = booking() if method == "POST" else None
+                start = time.perf_counter()
+                response = await client.request(method, path, json=body, headers=headers)
+                latencies[path].append((time.perf_counter() - start) * 1000)
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    everything = [ms for samples in latencies.values() for ms in samples]
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {elapsed:.2f}s, "
+          f"{args.requests / elapsed:.1f} req/s, {errors} errors")
+    print(f"{'route':40} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for path, samples in list(latencies.items()) + [("ALL", everything)]:
+        if samples:
+            print(f"{path:40} {statistics.median(samples):8.1f} "
+                  f"{percentile(samples, 95):8.1f} {percentile(samples, 99):8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--days-ahead", type=int, default=30, help="first day to book, from today")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,44 @@
+"""Argon2 login throughput: verifications per second, total and per core.
+
+Uses the same CryptContext and cost settings as the app (ARGON2_* in .env):
+
+    python benchmarks/password_hashing.py --seconds 5 --threads 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.passwords import pwd_context  # noqa: E402
+
+
+def measure(threads: int, seconds: float, hashed: str) -> int:
+    deadline = time.perf_counter() + seconds
+
+    def loop():
+        done = 0
+        while time.perf_counter() < deadline:
+            pwd_context.verify("correct horse battery staple", hashed)
+            done += 1
+        return done
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return sum(pool.map(lambda _: loop(), range(threads)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    hashed = pwd_context.hash("correct horse battery staple")
+    print(f"scheme params: {hashed.split('$')[3]}, cpus: {os.cpu_count()}")
+    print(f"{'threads':>8} {'logins/s':>10} {'per core':>10}")
+    for threads in args.threads:
+        verified = measure(threads, args.seconds, hashed)
+        rate = verified / args.seconds
+        print(f"{threads:>8} {rate:10.1f} {rate / min(threads, os.cpu_count() or 1):10.1f}")
@@ -0,0 +1,98 @@
+"""List-endpoint serialization throughput: rows per second, current vs fast path.
+
+current: ORM object per row -> the route's response_model validation
+         (FastAPI's own serialize_response) -> JSONResponse
+fast:    column tuples -> dicts -> orjson (services.serialization)
+
+No database needed; rows are synthetic but shaped like the real columns:
+
+    python benchmarks/serialization.py --rows 100 1000 10000 --seconds 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import APIRoute, serialize_response  # noqa: E402
+
+from main import BookingResponse, UserResponse, app  # noqa: E402
+from models import Booking, User  # noqa: E402
+from services.serialization import rows_response  # noqa: E402
+
+
+def user_rows(n):
+    now = datetime(2026, 10, 16, 9, 30, 15, 123456)
+    for i in range(n):
+        yield (
+            i + 1, f"user{i}", f"user{i}@example.com", f"User Number {i}", "+49123456789",
+            i % 3 != 0, "basic", i % 5, "completed" if i % 2 else "in_progress", now - timedelta(minutes=i),
+        )
+
+
+def booking_rows(n):
+    now = datetime(2026, 10, 16, 9, 30, 15, 123456)
+    for i in range(n):
+        yield (
+            i + 1, f"Customer {i}", f"user{i}@example.com", "+49123456789", date(2026, 11, 1) + timedelta(days=i % 60),
+            f"{9 + i % 8:02d}:00", ("pending", "confirmed", "rejected")[i % 3], i + 1, None, now - timedelta(minutes=i),
+        )
+
+
+CASES = {
+    "/api/admin/users": (User, UserResponse, user_rows),
+    "/api/admin/bookings": (Booking, BookingResponse, booking_rows),
+}
+
+
+def route_field(path):
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.path == path and "GET" in route.methods:
+            return route.response_field
+    raise SystemExit(f"No GET route {path}")
+
+
+loop = asyncio.new_event_loop()
+
+
+def current_path(model, fields, rows, field):
+    objects = [model(**dict(zip(fields, row))) for row in rows]
+    content = loop.run_until_complete(serialize_response(field=field, response_content=objects, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def fast_path(fields, rows):
+    return rows_response(rows, fields).body
+
+
+def rate(fn, rows, seconds):
+    done, deadline = 0, time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        fn()
+        done += rows
+    return done / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<22} {'rows':>6} {'current rows/s':>15} {'fast rows/s':>12} {'speedup':>8}")
+    for path, (model, schema, make_rows) in CASES.items():
+        field = route_field(path)
+        fields = list(schema.model_fields)
+        for n in args.rows:
+            rows = list(make_rows(n))
+            # Both paths must produce the same documents for the comparison to be fair
+            assert json.loads(fast_path(fields, rows)) == json.loads(current_path(model, fields, rows, field))
+            current = rate(lambda: current_path(model, fields, rows, field), n, args.seconds)
+            fast = rate(lambda: fast_path(fields, rows), n, args.seconds)
+            print(f"{path:<22} {n:>6} {current:>15,.0f} {fast:>12,.0f} {fast / current:>7.1f}x")
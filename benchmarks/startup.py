@@ -0,0 +1,128 @@
+"""Worker startup: `import main` time and time-to-first-request, with optional budgets.
+
+Import time is measured in fresh interpreters (no database needed). Readiness
+boots `uvicorn main:app` with the app's .env and polls until /health answers,
+then times the first request that needs the database and caches:
+
+    python benchmarks/startup.py --runs 5
+    python benchmarks/startup.py --skip-server --max-import-ms 1500
+
+Exits non-zero when a --max-* budget is exceeded; --importtime lists the
+slowest modules (python -X importtime) to see what regressed. The import
+budget and the no-database-at-import rule are also enforced by tests/test_startup.py.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_SNIPPET = "import time; s = time.perf_counter(); import main; print(time.perf_counter() - s)"
+
+
+def import_seconds() -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int):
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.split("|")
+        rows.append((int(cumulative_us), int(self_us.split(":")[-1]), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(url: str) -> int:
+    with urllib.request.urlopen(url, timeout=5) as response:
+        response.read()
+        return response.status
+
+
+def boot_once(timeout: float):
+    """(seconds until /health is 200, seconds for the first homepage-settings request)"""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        while True:
+            if server.poll() is not None:
+                raise SystemExit(f"uvicorn exited during startup:\n{server.stderr.read().decode()}")
+            if time.perf_counter() - started > timeout:
+                raise SystemExit(f"not ready after {timeout:.0f}s")
+            try:
+                if get(f"{base}/health") == 200:
+                    break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.02)
+        ready = time.perf_counter() - started
+        first_started = time.perf_counter()
+        get(f"{base}/api/customer/settings/homepage")
+        return ready, time.perf_counter() - first_started
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def summary(samples) -> str:
+    ms = [s * 1000 for s in samples]
+    return f"median {statistics.median(ms):7.0f} ms   min {min(ms):7.0f} ms   max {max(ms):7.0f} ms"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=90.0)
+    parser.add_argument("--skip-server", action="store_true", help="only measure import time")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="show the N slowest imports")
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-ready-ms", type=float)
+    parser.add_argument("--max-first-request-ms", type=float)
+    args = parser.parse_args()
+
+    imports = [import_seconds() for _ in range(args.runs)]
+    print(f"import main          {summary(imports)}")
+    measured = {"import": imports}
+
+    if not args.skip_server:
+        boots = [boot_once(args.timeout) for _ in range(args.runs)]
+        measured["ready"] = [ready for ready, _ in boots]
+        measured["first_request"] = [first for _, first in boots]
+        print(f"time to /health 200  {summary(measured['ready'])}")
+        print(f"first DB request     {summary(measured['first_request'])}")
+
+    if args.importtime:
+        print(f"\n{'cumulative ms':>14} {'self ms':>8}  module")
+        for cumulative_us, self_us, name in slowest_imports(args.importtime):
+            print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {name}")
+
+    failed = []
+    for name, budget in (("import", args.max_import_ms), ("ready", args.max_ready_ms),
+                         ("first_request", args.max_first_request_ms)):
+        if budget is not None and name in measured and statistics.median(measured[name]) * 1000 > budget:
+            failed.append(f"{name} median {statistics.median(measured[name]) * 1000:.0f} ms > {budget:.0f} ms")
+    if failed:
+        print("\nBudget exceeded: " + "; ".join(failed))
+        sys.exit(1)
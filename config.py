@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -10,6 +12,95 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     USER_DATA_PATH: str = "./user_data"
     
+    # Connection pool, per engine and per worker process: budget
+    # workers * 2 engines * (DB_POOL_SIZE + DB_MAX_OVERFLOW) under max_connections.
+    # PgBouncer (transaction pooling) mode disables app-side pooling and prepared statements.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_PGBOUNCER_MODE: bool = False
+    # Connections opened per pool during startup (capped at DB_POOL_SIZE; 0 disables)
+    DB_POOL_PREFILL: int = 2
+    
+    # Boot: how long a worker waits for Postgres, and whether it runs
+    # `alembic upgrade head` itself (serialized by an advisory lock)
+    STARTUP_DB_TIMEOUT_SECONDS: float = 60.0
+    RUN_MIGRATIONS_ON_STARTUP: bool = False
+    
+    # Streaming replica for read-only admin routes; clients read the primary for
+    # REPLICA_STICKY_SECONDS after their own writes (should exceed normal replica lag)
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_STICKY_SECONDS: int = 10
+    
+    # Document storage: "filesystem" (under USER_DATA_PATH) or "database" (chunk table)
+    DOCUMENT_STORAGE_BACKEND: str = "filesystem"
+    DOCUMENT_CHUNK_SIZE: int = 1024 * 1024
+    # Stored-document compression: "auto" (zstd if installed, else gzip), "zstd",
+    # "gzip" or "none". Already-compressed types are skipped, as are files whose
+    # first chunk saves less than DOCUMENT_COMPRESSION_MIN_SAVING.
+    DOCUMENT_COMPRESSION: str = "auto"
+    DOCUMENT_COMPRESSION_LEVEL: Optional[int] = None  # codec default: zstd 3, gzip 6
+    DOCUMENT_COMPRESSION_MIN_SAVING: float = 0.1
+    
+    # Settings cache (NOTIFY enables cross-worker invalidation via Postgres LISTEN/NOTIFY)
+    SETTINGS_CACHE_TTL_SECONDS: int = 300
+    SETTINGS_CACHE_MAXSIZE: int = 128
+    SETTINGS_CACHE_NOTIFY: bool = False
+    
+    # Public gallery listing cache (invalidated on writes in the same worker)
+    GALLERY_CACHE_TTL_SECONDS: int = 60
+    
+    # Argon2 cost (defaults match passlib) and the bounded hashing pool
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 102400  # KiB
+    ARGON2_PARALLELISM: int = 8
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    
+    # Authenticated user snapshots cached by get_current_user
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAXSIZE: int = 10000
+    
+    # Serve dashboard counters from the dashboard_stats table kept current by write paths
+    DASHBOARD_STATS_MATERIALIZED: bool = False
+    
+    # Rows fetched per round trip from the server-side cursor behind /api/admin/export
+    EXPORT_BATCH_SIZE: int = 1000
+    
+    # Per-day booked intervals behind /api/customer/availability
+    AVAILABILITY_CACHE_TTL_SECONDS: int = 30
+    AVAILABILITY_CACHE_MAXSIZE: int = 400
+    AVAILABILITY_MAX_DAYS: int = 62
+    
+    # Booking notifications: sender is "file" (NDJSON outbox) or "smtp"
+    NOTIFICATION_SENDER: str = "file"
+    NOTIFICATION_OUTBOX_PATH: str = "./user_data/outbox.ndjson"
+    NOTIFICATION_WORKER_IN_PROCESS: bool = False
+    NOTIFICATION_BATCH_SIZE: int = 50
+    NOTIFICATION_POLL_SECONDS: float = 5.0
+    NOTIFICATION_MAX_ATTEMPTS: int = 8
+    # A claimed batch is leased, not locked, while it is sent; unsent rows are retried after this
+    NOTIFICATION_LEASE_SECONDS: float = 300.0
+    NOTIFICATION_BACKOFF_BASE_SECONDS: float = 30.0
+    NOTIFICATION_BACKOFF_MAX_SECONDS: float = 3600.0
+    REMINDER_LEAD_DAYS: int = 1
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 25
+    SMTP_USERNAME: str = ""
+    SMTP_PASSWORD: str = ""
+    SMTP_STARTTLS: bool = False
+    SMTP_FROM: str = "no-reply@localhost"
+    
+    # Log (and count in /metrics) requests that run the same SELECT this many times
+    METRICS_REPEATED_QUERY_THRESHOLD: int = 2
+    
+    # In-memory candidate matrix for /api/admin/matching (rebuilt per worker on this interval)
+    MATCHING_REFRESH_SECONDS: int = 300
+    # Initial skill columns per candidate row; widened on demand, never truncated
+    MATCHING_SKILL_COLUMNS: int = 24
+    
     class Config:
         env_file = ".env"
 
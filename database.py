@@ -1,12 +1,107 @@
-from sqlalchemy import create_engine
+import time
+import uuid
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from starlette.requests import Request
 from config import settings
+from services.metrics import POOL_TIMEOUTS, POOL_WAIT, instrument_engine, instrument_pool
+
+
+class _TimedPool:
+    """Pool mixin that records how long each checkout waited"""
+    metrics_label = ""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc(self.metrics_label)
+            raise
+        finally:
+            POOL_WAIT.observe(self.metrics_label, value=time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    metrics_label = "sync"
+
+
+class TimedAsyncQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+
+class TimedReplicaQueuePool(_TimedPool, QueuePool):
+    metrics_label = "replica"
+
+
+def pool_options(poolclass) -> dict:
+    """Engine pool kwargs from settings; PgBouncer mode leaves pooling to PgBouncer"""
+    if settings.DB_PGBOUNCER_MODE:
+        return {"poolclass": NullPool}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        # Reuse the most recent connection so surplus ones sit idle and get recycled
+        "pool_use_lifo": True,
+    }
+
 
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **pool_options(TimedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Optional streaming replica for read-only admin routes (see get_read_db)
+replica_engine = (
+    create_engine(settings.DATABASE_REPLICA_URL, **pool_options(TimedReplicaQueuePool))
+    if settings.DATABASE_REPLICA_URL else None
+)
+ReadSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=replica_engine or engine, info={"read_only": replica_engine is not None}
+)
+# Set after a successful write; while it is unexpired the client's reads stay on the primary
+PRIMARY_STICKY_COOKIE = "db_primary_until"
+
+# Async engine (asyncpg) for async def routes, so DB waits never block the event loop
+def async_database_url(url: str) -> str:
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+def async_connect_args() -> dict:
+    if not settings.DB_PGBOUNCER_MODE:
+        return {}
+    # Transaction pooling hands each transaction a different server connection,
+    # so asyncpg must not keep (or reuse names of) prepared statements
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+    }
+
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    connect_args=async_connect_args(),
+    **pool_options(TimedAsyncQueuePool)
+)
+# expire_on_commit=False: async sessions cannot lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Per-request query count / DB time and pool occupancy for /metrics and Server-Timing
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+instrument_pool(engine, "sync")
+instrument_pool(async_engine.sync_engine, "async")
+if replica_engine is not None:
+    instrument_engine(replica_engine)
+    instrument_pool(replica_engine, "replica")
+
 def get_db():
     db = SessionLocal()
     try:
@@ -14,5 +109,22 @@ def get_db():
     finally:
         db.close()
 
-def create_tables():
-    Base.metadata.create_all(bind=engine)
+def reads_from_primary(request: Request) -> bool:
+    """Read-your-writes: a client that just wrote keeps reading the primary for a while"""
+    try:
+        return float(request.cookies.get(PRIMARY_STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+def get_read_db(request: Request):
+    """Session for read-only routes: the replica when configured, unless the client is sticky"""
+    factory = SessionLocal if replica_engine is None or reads_from_primary(request) else ReadSessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,30 +1,81 @@
 
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Request, Query, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import Response
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from pydantic import BaseModel, EmailStr
+from sqlalchemy.orm import Session, defer
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from pydantic import BaseModel, EmailStr, Field, computed_field
 from typing import List, Optional
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
+from contextlib import asynccontextmanager
+import asyncio
 import os
-import shutil
 from pathlib import Path
-from passlib.context import CryptContext
 from fastapi.responses import StreamingResponse
-from io import BytesIO
 from models import UserDocument
 
-from database import create_tables, get_db
+from database import get_db, get_async_db, get_read_db, replica_engine
 from models import User, Booking, GalleryImage, UserDocument, Settings
 from config import settings
+from starlette.concurrency import run_in_threadpool
+from services.storage import save_upload, delete_document_file
+from services.http_cache import document_response, CachedStaticFiles
+from services.passwords import hash_password, verify_password, hash_password_sync
+from services.principal_cache import Principal, load_principal, invalidate_principal
+from services.pagination import NEXT_CURSOR_HEADER, keyset_page, parse_fields
+from services.serialization import FastJSONResponse, rows_response, schema_columns
+from services.dashboard_stats import get_dashboard_stats
+from services.availability import commit_booking_change, get_availability, resolve_slot, slot_is_free
+from services.notification_worker import notification_loop
+from services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, MetricsMiddleware
+from services.user_search import search_users
+from services.matching import Vacancy
+from services.candidate_index import (
+    match_vacancy, matched_skills, remove_user as remove_candidate,
+    sync_user as sync_candidate, sync_users as sync_candidates
+)
+from services.read_routing import PrimaryStickinessMiddleware
+from services.bulk import bulk_set_license, bulk_update_bookings
+from services.archive import ArchiveEntry, archive_names, iter_zip
+from services.export import (
+    BOOKING_EXPORT_FIELDS, DOCUMENT_EXPORT_FIELDS, USER_EXPORT_FIELDS, export_response
+)
+from services.gallery_images import (
+    generate_derivatives, delete_derivatives, build_srcset, stage_upload, publish, path_lock,
+    gallery_listing, invalidate_gallery_listing
+)
+from services.settings_cache import get_setting, notify_setting_changed, store_setting, stop_settings_listener
+from services.startup import dispose_engines, prefill_async_pool, prefill_count, sync_startup
+
+_background_tasks = set()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nothing touches the database at import time; a worker that cannot reach
+    # Postgres yet retries here (STARTUP_DB_TIMEOUT_SECONDS) instead of crashing
+    await run_in_threadpool(sync_startup)
+    if prefill_count():
+        await prefill_async_pool(prefill_count())
+    if settings.NOTIFICATION_WORKER_IN_PROCESS:
+        _background_tasks.add(asyncio.create_task(notification_loop()))
+    try:
+        yield
+    finally:
+        for task in _background_tasks:
+            task.cancel()
+        # Let the notification loop unwind before its engines go away
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+        _background_tasks.clear()
+        stop_settings_listener()
+        await dispose_engines()
 
 # Initialize FastAPI
 app = FastAPI(
     title="Unified Employee Agency API",
     version="3.0.0",
-    description="Combined Customer Website + Admin Portal Backend"
+    description="Combined Customer Website + Admin Portal Backend",
+    lifespan=lifespan
 )
 
 # CORS
@@ -34,24 +85,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Server-Timing"],
 )
+app.add_middleware(MetricsMiddleware, router=app.router)
+if replica_engine is not None:
+    app.add_middleware(PrimaryStickinessMiddleware)
 
-# Static files
-os.makedirs("static/cv", exist_ok=True)
-os.makedirs("static/gallery", exist_ok=True)
-os.makedirs(settings.USER_DATA_PATH, exist_ok=True)
-
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
-# Password hashing
-pwd_context = CryptContext(
-    schemes=["argon2"],
-    deprecated="auto"
-)
-
-
-# Create tables
-create_tables()
+# Static files (directories are created by the lifespan, before the first request)
+app.mount("/static", CachedStaticFiles(directory="static", check_dir=False), name="static")
 
 # ==================== SCHEMAS ====================
 
@@ -125,6 +166,26 @@ class BookingConfirm(BaseModel):
     admin_response: Optional[str] = None
     confirmed_by: str
 
+# Bulk admin operations (at most 1000 ids per call)
+class BookingBulkConfirm(BookingConfirm):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class BookingBulkUpdate(BookingUpdate):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class UserBulkLicense(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+    license_active: bool
+
+# Candidate matching
+class VacancyMatchRequest(BaseModel):
+    skills: List[str] = Field(..., min_length=1, max_length=50)
+    min_experience_years: Optional[float] = None
+    country: Optional[str] = None
+    city: Optional[str] = None
+    limit: int = Field(20, ge=1, le=200)
+    min_score: float = 0.0
+
 class BookingResponse(BaseModel):
     id: int
     name: str
@@ -147,8 +208,17 @@ class GalleryResponse(BaseModel):
     filepath: str
     title: Optional[str] = None
     description: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    variants: Optional[dict] = None
     created_at: datetime
     
+    @computed_field
+    @property
+    def srcset(self) -> Optional[dict]:
+        """Responsive manifest: {mime type: srcset string}; null until derivatives exist"""
+        return build_srcset(self.variants)
+    
     class Config:
         from_attributes = True
 
@@ -169,6 +239,114 @@ class DocumentOut(BaseModel):
         from_attributes = True
 
 
+# ==================== HELPERS ====================
+
+# Booking columns that (re)queue the decision notification
+NOTIFICATION_QUEUED = {
+    "notification_sent": False,
+    "notification_attempts": 0,
+    "notification_retry_at": None,
+    "notification_error": None
+}
+
+def document_metadata_select():
+    """UserDocument select that never loads (or lazy-loads) the file_data blob"""
+    return select(UserDocument).options(defer(UserDocument.file_data, raiseload=True))
+
+def user_filters(
+    license_active: Optional[bool] = None,
+    registration_status: Optional[str] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None
+) -> list:
+    """WHERE conditions shared by the user list and export endpoints"""
+    conditions = []
+    if license_active is not None:
+        conditions.append(User.license_active == license_active)
+    if registration_status:
+        conditions.append(User.registration_status == registration_status)
+    if created_from:
+        conditions.append(User.created_at >= created_from)
+    if created_to:
+        conditions.append(User.created_at < created_to + timedelta(days=1))
+    return conditions
+
+def booking_filters(
+    status: Optional[str] = None,
+    user_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> list:
+    """WHERE conditions shared by the booking list and export endpoints"""
+    conditions = []
+    if status:
+        conditions.append(Booking.status == status)
+    if user_id:
+        conditions.append(Booking.user_id == user_id)
+    if date_from:
+        conditions.append(Booking.date >= date_from)
+    if date_to:
+        conditions.append(Booking.date <= date_to)
+    return conditions
+
+def page_response(items: list, next_cursor: Optional[str]):
+    """Return a page as orjson bytes, with the next cursor in a header.
+
+    Items are already plain column dicts, so response_model validation is skipped.
+    """
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return FastJSONResponse(items, headers=headers)
+
+DOCUMENT_LIST_FIELDS = ["id", "user_id", "filename", "category", "description", "uploaded_at"]
+
+def document_list_response(db_rows, url_prefix: str):
+    """Document metadata tuples -> DocumentOut-shaped JSON with download links"""
+    return rows_response(
+        db_rows, DOCUMENT_LIST_FIELDS,
+        lambda item: {"download_url": f"{url_prefix}/{item['id']}"}
+    )
+
+def document_list_select(user_id: int):
+    return (
+        select(*[getattr(UserDocument, name) for name in DOCUMENT_LIST_FIELDS])
+        .where(UserDocument.user_id == user_id)
+    )
+
+async def store_user_document(
+    db: AsyncSession,
+    file: UploadFile,
+    user: User,
+    category: str = None,
+    description: str = None
+) -> UserDocument:
+    """Stream an upload into document storage and add its UserDocument row"""
+    stored = await save_upload(file, user.user_folder)
+    document = UserDocument(
+        user_id=user.id,
+        filename=file.filename,
+        original_filename=file.filename,
+        file_type=file.content_type,
+        file_size=stored.size,
+        file_path=stored.path,
+        content_hash=stored.sha256,
+        compression=stored.compression,
+        compressed_size=stored.stored_size,
+        category=category,
+        description=description
+    )
+    db.add(document)
+    return document
+
+async def commit_stored_documents(db: AsyncSession, *documents: UserDocument) -> None:
+    """Commit rows added by store_user_document; their stored bytes go if the commit fails"""
+    try:
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        for document in documents:
+            await run_in_threadpool(delete_document_file, document.file_path)
+        raise
+
 # ==================== CUSTOMER ROUTES ====================
 
 @app.post("/api/customer/register/start", response_model=UserResponse)
@@ -190,8 +368,8 @@ def customer_register_start(user: UserRegisterCustomer, db: Session = Depends(ge
         license_active=False  # Not active until admin approves
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    # Flush for the id so the folder is set in the same transaction (one commit, one refresh)
+    db.flush()
     
     # Create user folder
     user_folder = Path(settings.USER_DATA_PATH) / f"user_{db_user.id}_{db_user.username}"
@@ -214,109 +392,81 @@ def customer_register_update(id: int, user: UserUpdate, db: Session = Depends(ge
     
     db.commit()
     db.refresh(db_user)
+    invalidate_principal(db_user.email)
+    sync_candidate(db_user)
     return db_user
 
 @app.post("/api/customer/register/upload-cv/{id}")
-async def customer_upload_cv(id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
-    """Customer upload CV (store directly in DB, not in local storage)"""
+async def customer_upload_cv(id: int, file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)):
+    """Customer upload CV (streamed into document storage)"""
     
-    db_user = db.query(User).filter(User.id == id).first()
+    db_user = await db.get(User, id)
     if not db_user:
         raise HTTPException(status_code=404, detail="Registration not found")
     
-    file_bytes = await file.read()
-
-    document = UserDocument(
-        user_id=id,
-        filename=file.filename,
-        original_filename=file.filename,
-        file_type=file.content_type,
-        file_size=len(file_bytes),
-        file_path=None, 
-        file_data=file_bytes,   
-        category="cv",
-        description="User CV"
-    )
-
-    db.add(document)
+    document = await store_user_document(db, file, db_user, category="cv", description="User CV")
     db_user.current_step = 5
     db_user.registration_status = "submitted"
-    db.commit()
+    await commit_stored_documents(db, document)
     
     return {"message": "CV uploaded successfully", "filename": file.filename}
 
 @app.post("/api/customer/register/payment/{id}")
-async def customer_upload_payment(id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def customer_upload_payment(id: int, file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)):
     
-    db_user = db.query(User).filter(User.id == id).first()
+    db_user = await db.get(User, id)
     if not db_user:
         raise HTTPException(status_code=404, detail="Registration not found")
     
-    file_bytes = await file.read()
-
-    document = UserDocument(
-        user_id=id,
-        filename=file.filename,
-        original_filename=file.filename,
-        file_type=file.content_type,
-        file_size=len(file_bytes),
-        file_path=None, 
-        file_data=file_bytes,   
-        category="payment",
-        description="User Payment"
-    )
-
-    db.add(document)
+    document = await store_user_document(db, file, db_user, category="payment", description="User Payment")
     db_user.current_step = 5
     db_user.registration_status = "submitted"
-    db.commit()
+    await commit_stored_documents(db, document)
     
     return {"message": "payment uploaded successfully", "filename": file.filename}
 
 @app.post("/api/customer/booking/create", response_model=BookingResponse)
 def customer_create_booking(booking: BookingCreate, db: Session = Depends(get_db)):
-    db_booking = Booking(**booking.model_dump())
+    time, duration = resolve_slot(booking.time)
+    if not slot_is_free(db, booking.date, time, duration):
+        raise HTTPException(status_code=409, detail="This time slot is already booked")
+    db_booking = Booking(**booking.model_dump(exclude={"time"}), time=time, duration_minutes=duration)
     
     db.add(db_booking)
-    db.commit()
+    commit_booking_change(db, booking.date)
     db.refresh(db_booking)
 
     return db_booking
 
 
+@app.get("/api/customer/availability")
+def customer_get_availability(
+    date_from: date,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Open/taken state of every configured time slot per day"""
+    date_to = date_to or date_from
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to is before date_from")
+    if (date_to - date_from).days >= settings.AVAILABILITY_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.AVAILABILITY_MAX_DAYS} days per request")
+    return get_availability(db, date_from, date_to)
+
 @app.get("/api/customer/gallery", response_model=List[GalleryResponse])
-def customer_get_gallery(db: Session = Depends(get_db)):
-    """Get all gallery images"""
-    return db.query(GalleryImage).all()
+def customer_get_gallery():
+    """Get all gallery images (cached)"""
+    return FastJSONResponse(gallery_listing())
 
 @app.get("/api/customer/settings/homepage")
-def customer_get_homepage(db: Session = Depends(get_db)):
-    """Get homepage content"""
-    setting = db.query(Settings).filter(Settings.key == "homepage_content").first()
-    if not setting:
-        default = {
-            "hero_title": "Your Gateway to European Employment",
-            "hero_subtitle": "Connecting talented professionals with opportunities across EU",
-            "about_text": "We specialize in placing skilled workers in positions throughout Europe.",
-            "countries": ["Germany", "France", "Netherlands", "Belgium", "Austria"]
-        }
-        setting = Settings(key="homepage_content", value=default)
-        db.add(setting)
-        db.commit()
-        db.refresh(setting)
-    return setting
+def customer_get_homepage():
+    """Get homepage content (cached)"""
+    return get_setting("homepage_content")
 
 @app.get("/api/customer/settings/time-slots")
-def customer_get_time_slots(db: Session = Depends(get_db)):
-    """Get available time slots"""
-    setting = db.query(Settings).filter(Settings.key == "time_slots").first()
-    if not setting:
-        default = {"slots": ["09:00", "10:00", "11:00", "14:00", "15:00", "16:00"]}
-        setting = Settings(key="time_slots", value=default)
-        db.add(setting)
-        db.commit()
-        db.refresh(setting)
-    return setting
+def customer_get_time_slots():
+    """Get available time slots (cached)"""
+    return get_setting("time_slots")
 
 # ==================== ADMIN ROUTES ====================
 
@@ -330,7 +480,7 @@ def admin_create_user(user: UserCreateAdmin, db: Session = Depends(get_db)):
     if existing:
         raise HTTPException(status_code=400, detail="Username or email already exists")
     
-    hashed_password = pwd_context.hash(user.password)
+    hashed_password = hash_password_sync(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -341,8 +491,8 @@ def admin_create_user(user: UserCreateAdmin, db: Session = Depends(get_db)):
         license_active=True
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    # Flush for the id so the folder is set in the same transaction (one commit, one refresh)
+    db.flush()
     
     # Create user folder
     user_folder = Path(settings.USER_DATA_PATH) / f"user_{db_user.id}_{db_user.username}"
@@ -354,9 +504,42 @@ def admin_create_user(user: UserCreateAdmin, db: Session = Depends(get_db)):
     return db_user
 
 @app.get("/api/admin/users", response_model=List[UserResponse])
-def admin_get_users(db: Session = Depends(get_db)):
-    """Admin get all users"""
-    return db.query(User).all()
+def admin_get_users(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    license_active: Optional[bool] = None,
+    registration_status: Optional[str] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Admin list users, newest first (keyset paginated on created_at, id)"""
+    projection = parse_fields(fields, UserResponse.model_fields)
+    items, next_cursor = keyset_page(
+        db, User, projection or list(UserResponse.model_fields),
+        user_filters(license_active, registration_status, created_from, created_to),
+        User.created_at, cursor, limit, datetime.fromisoformat
+    )
+    return page_response(items, next_cursor)
+
+@app.get("/api/admin/users/search")
+def admin_search_users(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    license_active: Optional[bool] = None,
+    registration_status: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Admin ranked candidate search over skills, roles, names and places (with highlights)"""
+    projection = parse_fields(fields, UserResponse.model_fields)
+    items, next_cursor = search_users(
+        db, q, projection or list(UserResponse.model_fields),
+        user_filters(license_active, registration_status), cursor, limit
+    )
+    return page_response(items, next_cursor)
 
 @app.get("/api/admin/users/{user_id}", response_model=UserResponse)
 def admin_get_user(user_id: int, db: Session = Depends(get_db)):
@@ -378,6 +561,8 @@ def admin_update_user(user_id: int, user_update: UserUpdate, db: Session = Depen
     
     db.commit()
     db.refresh(user)
+    invalidate_principal(user.email)
+    sync_candidate(user)
     return user
 
 @app.post("/api/admin/users/{user_id}/toggle-license", response_model=UserResponse)
@@ -390,8 +575,17 @@ def admin_toggle_license(user_id: int, license_data: dict, db: Session = Depends
     user.license_active = license_data.get("license_active", True)
     db.commit()
     db.refresh(user)
+    invalidate_principal(user.email)
+    sync_candidate(user)
     return user
 
+@app.post("/api/admin/users/bulk/license")
+def admin_bulk_license(payload: UserBulkLicense, db: Session = Depends(get_db)):
+    """Admin activate/deactivate many licenses at once"""
+    result = bulk_set_license(db, payload.ids, payload.license_active)
+    sync_candidates(db, payload.ids)
+    return result
+
 @app.delete("/api/admin/users/{user_id}")
 def admin_delete_user(user_id: int, db: Session = Depends(get_db)):
     """Admin delete user"""
@@ -399,25 +593,77 @@ def admin_delete_user(user_id: int, db: Session = Depends(get_db)):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
+    email = user.email
     db.delete(user)
     db.commit()
+    invalidate_principal(email)
+    remove_candidate(user_id)
     return {"message": "User deleted successfully"}
 
+# Candidate matching
+@app.post("/api/admin/matching/candidates")
+def admin_match_candidates(vacancy: VacancyMatchRequest, db: Session = Depends(get_read_db)):
+    """Admin rank licensed candidates against a vacancy (skills, experience, location)"""
+    query = Vacancy(vacancy.skills, vacancy.min_experience_years, vacancy.country, vacancy.city)
+    ranked = match_vacancy(query, vacancy.limit, vacancy.min_score)
+    if not ranked:
+        return []
+    columns = [getattr(User, name) for name in UserResponse.model_fields]
+    users = {row.id: row._asdict() for row in db.execute(
+        select(*columns).where(User.id.in_([user_id for user_id, _ in ranked]))
+    )}
+    return [
+        {**users[user_id], "score": round(score, 4), "matched_skills": matched_skills(user_id, query)}
+        for user_id, score in ranked
+        if user_id in users
+    ]
+
 # Bookings Management
 @app.get("/api/admin/bookings", response_model=List[BookingResponse])
-def admin_get_bookings(status: str = None, user_id: int = None, db: Session = Depends(get_db)):
-    """Admin get all bookings"""
-    query = db.query(Booking)
-    if status:
-        query = query.filter(Booking.status == status)
-    if user_id:
-        query = query.filter(Booking.user_id == user_id)
-    return query.order_by(Booking.date.desc()).all()
+def admin_get_bookings(
+    status: str = None,
+    user_id: int = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Admin list bookings, latest date first (keyset paginated on date, id)"""
+    projection = parse_fields(fields, BookingResponse.model_fields)
+    items, next_cursor = keyset_page(
+        db, Booking, projection or list(BookingResponse.model_fields),
+        booking_filters(status, user_id, date_from, date_to),
+        Booking.date, cursor, limit, date.fromisoformat
+    )
+    return page_response(items, next_cursor)
+
+# Declared before /bookings/{booking_id}/... so "bulk" is not taken for an id
+@app.post("/api/admin/bookings/bulk/confirm")
+def admin_bulk_confirm_bookings(payload: BookingBulkConfirm, db: Session = Depends(get_db)):
+    """Admin confirm/reject many bookings at once"""
+    return bulk_update_bookings(db, payload.ids, {
+        "status": payload.status,
+        "admin_response": payload.admin_response,
+        "confirmed_by": payload.confirmed_by,
+        "confirmed_at": datetime.now(),
+        **NOTIFICATION_QUEUED
+    })
+
+@app.post("/api/admin/bookings/bulk/update")
+def admin_bulk_update_bookings(payload: BookingBulkUpdate, db: Session = Depends(get_db)):
+    """Admin update many bookings at once"""
+    values = payload.model_dump(exclude_unset=True, exclude={"ids"})
+    if not values:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    return bulk_update_bookings(db, payload.ids, values)
 
 @app.get("/api/admin/bookings/pending", response_model=List[BookingResponse])
-def admin_get_pending_bookings(db: Session = Depends(get_db)):
+def admin_get_pending_bookings(db: Session = Depends(get_read_db)):
     """Admin get pending bookings"""
-    return db.query(Booking).filter(Booking.status == "pending").all()
+    rows = db.execute(select(*schema_columns(Booking, BookingResponse)).where(Booking.status == "pending"))
+    return rows_response(rows, list(BookingResponse.model_fields))
 
 @app.post("/api/admin/bookings/{booking_id}/confirm", response_model=BookingResponse)
 def admin_confirm_booking(booking_id: int, confirm: BookingConfirm, db: Session = Depends(get_db)):
@@ -430,8 +676,10 @@ def admin_confirm_booking(booking_id: int, confirm: BookingConfirm, db: Session
     booking.admin_response = confirm.admin_response
     booking.confirmed_by = confirm.confirmed_by
     booking.confirmed_at = datetime.now()
-    booking.notification_sent = True
-    db.commit()
+    # Queued for services.notification_worker rather than sent inline
+    for key, value in NOTIFICATION_QUEUED.items():
+        setattr(booking, key, value)
+    commit_booking_change(db, booking.date)
     db.refresh(booking)
     return booking
 
@@ -445,7 +693,7 @@ def admin_update_booking(booking_id: int, booking_update: BookingUpdate, db: Ses
     for key, value in booking_update.model_dump(exclude_unset=True).items():
         setattr(booking, key, value)
     
-    db.commit()
+    commit_booking_change(db, booking.date)
     db.refresh(booking)
     return booking
 
@@ -456,46 +704,60 @@ def admin_delete_booking(booking_id: int, db: Session = Depends(get_db)):
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
     
+    day = booking.date
     db.delete(booking)
-    db.commit()
+    commit_booking_change(db, day)
     return {"message": "Booking deleted successfully"}
 
 # Gallery Management
 @app.post("/api/admin/gallery/upload", response_model=GalleryResponse)
 async def admin_upload_gallery(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     title: str = None,
     description: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Admin upload gallery image"""
-    file_path = f"static/gallery/{file.filename}"
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    """Admin upload gallery image (thumbnail/medium/WebP variants are built in the background)"""
+    # Stored under its content hash: identical uploads share one file
+    staged = await run_in_threadpool(stage_upload, file.file)
+    await db.execute(path_lock(staged.path))
+    await run_in_threadpool(publish, staged)
     
     db_image = GalleryImage(
         filename=file.filename,
-        filepath=file_path,
+        filepath=staged.path,
+        content_hash=staged.content_hash,
         title=title,
         description=description
     )
     db.add(db_image)
-    db.commit()
-    db.refresh(db_image)
+    await db.commit()
+    await db.refresh(db_image)
+    invalidate_gallery_listing()
+    background_tasks.add_task(generate_derivatives, db_image.id)
     return db_image
 
 @app.delete("/api/admin/gallery/{image_id}")
 def admin_delete_gallery(image_id: int, db: Session = Depends(get_db)):
-    """Admin delete gallery image"""
+    """Admin delete gallery image (the file goes once no other image references it)"""
     image = db.query(GalleryImage).filter(GalleryImage.id == image_id).first()
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
     
-    if os.path.exists(image.filepath):
-        os.remove(image.filepath)
-    
+    db.execute(path_lock(image.filepath))
+    references = db.query(func.count(GalleryImage.id)).filter(
+        GalleryImage.filepath == image.filepath,
+        GalleryImage.id != image.id
+    ).scalar()
     db.delete(image)
+    db.flush()
+    if references == 0:
+        if os.path.exists(image.filepath):
+            os.remove(image.filepath)
+        delete_derivatives(image.variants)
     db.commit()
+    invalidate_gallery_listing()
     return {"message": "Image deleted successfully"}
 
 # Settings Management
@@ -508,8 +770,10 @@ def admin_update_homepage(update: SettingsUpdate, db: Session = Depends(get_db))
         db.add(setting)
     else:
         setting.value = update.value
+    notify_setting_changed(db, "homepage_content")
     db.commit()
     db.refresh(setting)
+    store_setting(setting)
     return {"message": "Homepage updated", "value": setting.value}
 
 @app.put("/api/admin/settings/time-slots", response_model=dict)
@@ -521,13 +785,15 @@ def admin_update_time_slots(update: SettingsUpdate, db: Session = Depends(get_db
         db.add(setting)
     else:
         setting.value = update.value
+    notify_setting_changed(db, "time_slots")
     db.commit()
     db.refresh(setting)
+    store_setting(setting)
     return {"message": "Time slots updated", "value": setting.value}
 
 # Calendar
 @app.get("/api/admin/calendar/today")
-def admin_calendar_today(db: Session = Depends(get_db)):
+def admin_calendar_today(db: Session = Depends(get_read_db)):
     """Get today's calendar events"""
     today = date.today()
     events = db.query(Booking).filter(
@@ -537,9 +803,8 @@ def admin_calendar_today(db: Session = Depends(get_db)):
     return events
 
 @app.get("/api/admin/calendar/upcoming")
-def admin_calendar_upcoming(days: int = 7, db: Session = Depends(get_db)):
+def admin_calendar_upcoming(days: int = 7, db: Session = Depends(get_read_db)):
     """Get upcoming calendar events"""
-    from datetime import timedelta
     today = date.today()
     future_date = today + timedelta(days=days)
     
@@ -551,7 +816,7 @@ def admin_calendar_upcoming(days: int = 7, db: Session = Depends(get_db)):
     return events
 
 @app.get("/api/admin/calendar/notifications/pending")
-def admin_calendar_pending(db: Session = Depends(get_db)):
+def admin_calendar_pending(db: Session = Depends(get_read_db)):
     """Get pending booking notifications"""
     bookings = db.query(Booking).filter(
         Booking.status == "pending",
@@ -561,38 +826,12 @@ def admin_calendar_pending(db: Session = Depends(get_db)):
 
 # Dashboard
 @app.get("/api/admin/dashboard/stats")
-def admin_dashboard_stats(db: Session = Depends(get_db)):
-    """Admin dashboard statistics"""
-    total_users = db.query(User).count()
-    active_users = db.query(User).filter(User.license_active == True).count()
-    inactive_users = total_users - active_users
-    
-    total_bookings = db.query(Booking).count()
-    pending_bookings = db.query(Booking).filter(Booking.status == "pending").count()
-    confirmed_bookings = db.query(Booking).filter(Booking.status == "confirmed").count()
-    completed_bookings = db.query(Booking).filter(Booking.status == "completed").count()
-    
-    total_documents = db.query(UserDocument).count()
-    
-    return {
-        "users": {
-            "total": total_users,
-            "active": active_users,
-            "inactive": inactive_users
-        },
-        "bookings": {
-            "total": total_bookings,
-            "pending": pending_bookings,
-            "confirmed": confirmed_bookings,
-            "completed": completed_bookings
-        },
-        "documents": {
-            "total": total_documents
-        }
-    }
+def admin_dashboard_stats(db: Session = Depends(get_read_db)):
+    """Admin dashboard statistics (single query, or the materialized counters)"""
+    return get_dashboard_stats(db)
 
 @app.get("/api/admin/dashboard/recent-activity")
-def admin_recent_activity(limit: int = 10, db: Session = Depends(get_db)):
+def admin_recent_activity(limit: int = 10, db: Session = Depends(get_read_db)):
     """Get recent activity"""
     recent_bookings = db.query(Booking).order_by(Booking.created_at.desc()).limit(limit).all()
     recent_users = db.query(User).order_by(User.created_at.desc()).limit(limit).all()
@@ -605,22 +844,8 @@ def admin_recent_activity(limit: int = 10, db: Session = Depends(get_db)):
 # Documents
 @app.get("/api/admin/documents/user/{user_id}", response_model=List[DocumentOut])
 def list_user_documents(user_id: int, db: Session = Depends(get_db)):
-    docs = db.query(UserDocument).filter(UserDocument.user_id == user_id).all()
-    result = []
-    for d in docs:
-        download_url = f"/api/admin/documents/download/{d.id}"
-        # Convert to dict first, then add download_url
-        doc_dict = {
-            "id": d.id,
-            "user_id": d.user_id,
-            "filename": d.filename,
-            "category": d.category,
-            "description": d.description,
-            "uploaded_at": d.uploaded_at,
-            "download_url": download_url
-        }
-        result.append(DocumentOut(**doc_dict))
-    return result
+    rows = db.execute(document_list_select(user_id))
+    return document_list_response(rows, "/api/admin/documents/download")
 
 # Also fix the admin_upload_document endpoint
 @app.post("/api/admin/documents/upload/{user_id}", response_model=DocumentOut)
@@ -629,29 +854,15 @@ async def admin_upload_document(
     file: UploadFile = File(...),
     category: str = None,
     description: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    file_bytes = await file.read()
-
-    document = UserDocument(
-        user_id=user_id,
-        filename=file.filename,
-        original_filename=file.filename,
-        file_type=file.content_type,
-        file_size=len(file_bytes),
-        file_path=None,
-        file_data=file_bytes,
-        category=category,
-        description=description
-    )
-
-    db.add(document)
-    db.commit()
-    db.refresh(document)
+    document = await store_user_document(db, file, user, category, description)
+    await commit_stored_documents(db, document)
+    await db.refresh(document)
 
     download_url = f"/api/admin/documents/download/{document.id}"
     return DocumentOut(
@@ -665,27 +876,112 @@ async def admin_upload_document(
     )
 # Add this endpoint to serve images directly (for frontend display)
 @app.get("/api/admin/documents/view/{doc_id}")
-def view_document(doc_id: int, db: Session = Depends(get_db)):
-    doc = db.query(UserDocument).filter(UserDocument.id == doc_id).first()
+def view_document(doc_id: int, request: Request, db: Session = Depends(get_db)):
+    doc = db.execute(document_metadata_select().where(UserDocument.id == doc_id)).scalars().first()
     if not doc:
         raise HTTPException(404, "Document not found")
     
+    return document_response(request, doc, "inline")
+
+
+# Document archives (ZIP streamed chunk by chunk, laid out by category)
+MAX_ARCHIVE_USERS = 100
+
+def document_archive_response(db: Session, user_ids: List[int], filename: str) -> StreamingResponse:
+    rows = db.execute(
+        select(
+            UserDocument.id, UserDocument.user_id, UserDocument.filename, UserDocument.file_path,
+            UserDocument.file_size, UserDocument.file_type, UserDocument.category,
+            UserDocument.uploaded_at, UserDocument.compression, User.username
+        )
+        .join(User, User.id == UserDocument.user_id)
+        .where(UserDocument.user_id.in_(user_ids))
+        .order_by(UserDocument.user_id, UserDocument.category, UserDocument.id)
+    ).all()
+    if not rows:
+        raise HTTPException(404, "No documents found")
+    entries = [
+        ArchiveEntry(row.id, row.file_path, row.file_size, row.file_type, arcname, row.uploaded_at, row.compression)
+        for row, arcname in archive_names(rows, per_user=len(user_ids) > 1)
+    ]
     return StreamingResponse(
-        BytesIO(doc.file_data),
-        media_type=doc.file_type or "application/octet-stream",
-        headers={"Content-Disposition": f"inline; filename={doc.filename}"}
+        iter_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@app.get("/api/admin/documents/user/{user_id}/archive")
+def admin_user_documents_archive(user_id: int, db: Session = Depends(get_db)):
+    """Admin download all of a user's documents as one ZIP"""
+    return document_archive_response(db, [user_id], f"user_{user_id}_documents.zip")
+
+@app.get("/api/admin/documents/archive")
+def admin_documents_archive(user_ids: List[int] = Query(...), db: Session = Depends(get_db)):
+    """Admin download several users' documents as one ZIP (one folder per user)"""
+    user_ids = list(dict.fromkeys(user_ids))
+    if len(user_ids) > MAX_ARCHIVE_USERS:
+        raise HTTPException(400, f"At most {MAX_ARCHIVE_USERS} users per archive")
+    return document_archive_response(db, user_ids, "documents.zip")
+
+# Exports (streamed from a server-side cursor, so memory stays flat for any row count)
+@app.get("/api/admin/export/users")
+def admin_export_users(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    license_active: Optional[bool] = None,
+    registration_status: Optional[str] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    fields: Optional[str] = None
+):
+    """Admin export users as CSV or NDJSON"""
+    return export_response(
+        User, parse_fields(fields, USER_EXPORT_FIELDS) or USER_EXPORT_FIELDS,
+        user_filters(license_active, registration_status, created_from, created_to),
+        format, "users"
+    )
+
+@app.get("/api/admin/export/bookings")
+def admin_export_bookings(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    status: str = None,
+    user_id: int = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    fields: Optional[str] = None
+):
+    """Admin export bookings as CSV or NDJSON"""
+    return export_response(
+        Booking, parse_fields(fields, BOOKING_EXPORT_FIELDS) or BOOKING_EXPORT_FIELDS,
+        booking_filters(status, user_id, date_from, date_to),
+        format, "bookings"
     )
 
+@app.get("/api/admin/export/documents")
+def admin_export_documents(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    user_id: int = None,
+    category: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """Admin export document metadata (not file contents) as CSV or NDJSON"""
+    conditions = []
+    if user_id:
+        conditions.append(UserDocument.user_id == user_id)
+    if category:
+        conditions.append(UserDocument.category == category)
+    return export_response(
+        UserDocument, parse_fields(fields, DOCUMENT_EXPORT_FIELDS) or DOCUMENT_EXPORT_FIELDS,
+        conditions, format, "documents"
+    )
 
 # ==================== user profile ====================
 
 
 # Add these imports at the top (if not already present)
-from datetime import timedelta
 from jose import JWTError, jwt
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 
-# Add these configurations after pwd_context
+# Token configuration
 SECRET_KEY = "your-secret-key-change-this-in-production"  # Change this!
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -731,13 +1027,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
-
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
@@ -752,7 +1042,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == token_data.email).first()
+    user = await load_principal(db, token_data.email)
     if user is None:
         raise credentials_exception
     
@@ -764,10 +1054,22 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
 
 # ==================== NEW CUSTOMER AUTH & PROFILE ROUTES ====================
 
+async def current_user_row(db: AsyncSession, current_user: Principal) -> User:
+    """Load the principal's User row; a principal cached in another worker can outlive a deleted user"""
+    user = await db.get(User, current_user.id)
+    if user is None:
+        invalidate_principal(current_user.email)
+        raise HTTPException(
+            status_code=401,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
 @app.post("/api/customer/login", response_model=Token)
-async def customer_login(form_data: CustomerLogin, db: Session = Depends(get_db)):
+async def customer_login(form_data: CustomerLogin, db: AsyncSession = Depends(get_async_db)):
     """Customer login endpoint"""
-    user = db.query(User).filter(User.email == form_data.email).first()
+    user = (await db.execute(select(User).where(User.email == form_data.email))).scalars().first()
     
     if not user:
         raise HTTPException(status_code=401, detail="Incorrect email or password")
@@ -778,7 +1080,7 @@ async def customer_login(form_data: CustomerLogin, db: Session = Depends(get_db)
             detail="No password set. Please contact administrator to set up your password."
         )
     
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Incorrect email or password")
     
     # Check if account is active
@@ -790,7 +1092,7 @@ async def customer_login(form_data: CustomerLogin, db: Session = Depends(get_db)
     
     # Update last login
     user.last_login = datetime.now()
-    db.commit()
+    await db.commit()
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -805,91 +1107,68 @@ async def customer_login(form_data: CustomerLogin, db: Session = Depends(get_db)
     }
 
 @app.get("/api/customer/profile/me", response_model=UserResponse)
-async def get_customer_profile(current_user: User = Depends(get_current_user)):
+async def get_customer_profile(current_user: Principal = Depends(get_current_user)):
     """Get current user profile"""
     return current_user
 
 @app.put("/api/customer/profile/me", response_model=UserResponse)
 async def update_customer_profile(
     profile_update: UserProfileUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update customer profile"""
+    user = await current_user_row(db, current_user)
     for key, value in profile_update.model_dump(exclude_unset=True).items():
-        setattr(current_user, key, value)
+        setattr(user, key, value)
     
-    current_user.updated_at = datetime.now()
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    user.updated_at = datetime.now()
+    await db.commit()
+    await db.refresh(user)
+    invalidate_principal(user.email)
+    sync_candidate(user)
+    return user
 
 @app.post("/api/customer/profile/change-password")
 async def change_customer_password(
     password_update: PasswordUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Change customer password"""
-    if not current_user.hashed_password:
+    user = await current_user_row(db, current_user)
+    if not user.hashed_password:
         raise HTTPException(status_code=400, detail="No password set. Contact administrator.")
     
-    if not verify_password(password_update.old_password, current_user.hashed_password):
+    if not await verify_password(password_update.old_password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect current password")
     
-    current_user.hashed_password = get_password_hash(password_update.new_password)
-    db.commit()
+    user.hashed_password = await hash_password(password_update.new_password)
+    await db.commit()
     
     return {"message": "Password changed successfully"}
 
 @app.get("/api/customer/profile/documents", response_model=List[DocumentOut])
 async def get_customer_documents(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all documents for current user"""
-    docs = db.query(UserDocument).filter(UserDocument.user_id == current_user.id).all()
-    result = []
-    for d in docs:
-        download_url = f"/api/customer/profile/documents/download/{d.id}"
-        doc_dict = {
-            "id": d.id,
-            "user_id": d.user_id,
-            "filename": d.filename,
-            "category": d.category,
-            "description": d.description,
-            "uploaded_at": d.uploaded_at,
-            "download_url": download_url
-        }
-        result.append(DocumentOut(**doc_dict))
-    return result
+    rows = await db.execute(document_list_select(current_user.id))
+    return document_list_response(rows, "/api/customer/profile/documents/download")
 
 @app.post("/api/customer/profile/documents/upload", response_model=DocumentOut)
 async def upload_customer_document(
     file: UploadFile = File(...),
     category: str = None,
     description: str = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload document for current user"""
-    file_bytes = await file.read()
-
-    document = UserDocument(
-        user_id=current_user.id,
-        filename=file.filename,
-        original_filename=file.filename,
-        file_type=file.content_type,
-        file_size=len(file_bytes),
-        file_path=None,
-        file_data=file_bytes,
-        category=category,
-        description=description
-    )
-
-    db.add(document)
-    db.commit()
-    db.refresh(document)
+    document = await store_user_document(db, file, current_user, category, description)
+    await commit_stored_documents(db, document)
+    await db.refresh(document)
 
     download_url = f"/api/customer/profile/documents/download/{document.id}"
     return DocumentOut(
@@ -905,64 +1184,67 @@ async def upload_customer_document(
 @app.get("/api/customer/profile/documents/download/{doc_id}")
 async def download_customer_document(
     doc_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Download document (only own documents)"""
-    doc = db.query(UserDocument).filter(
+    doc = (await db.execute(document_metadata_select().where(
         UserDocument.id == doc_id,
         UserDocument.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
     
     if not doc:
         raise HTTPException(404, "Document not found")
     
-    return StreamingResponse(
-        BytesIO(doc.file_data),
-        media_type=doc.file_type or "application/octet-stream",
-        headers={"Content-Disposition": f"attachment; filename={doc.filename}"}
-    )
+    return document_response(request, doc, "attachment")
 
 @app.delete("/api/customer/profile/documents/{doc_id}")
 async def delete_customer_document(
     doc_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete own document"""
-    doc = db.query(UserDocument).filter(
+    doc = (await db.execute(document_metadata_select().where(
         UserDocument.id == doc_id,
         UserDocument.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
     
     if not doc:
         raise HTTPException(404, "Document not found")
     
-    db.delete(doc)
-    db.commit()
+    file_path = doc.file_path
+    await db.delete(doc)
+    await db.commit()
+    # The database backend deletes chunk rows through a sync session
+    await run_in_threadpool(delete_document_file, file_path)
     return {"message": "Document deleted successfully"}
 
 @app.get("/api/customer/profile/bookings", response_model=List[BookingResponse])
 async def get_customer_bookings(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all bookings for current user"""
-    bookings = db.query(Booking).filter(Booking.email == current_user.email).order_by(Booking.date.desc()).all()
-    return bookings
+    rows = await db.execute(
+        select(*schema_columns(Booking, BookingResponse))
+        .where(Booking.email == current_user.email).order_by(Booking.date.desc())
+    )
+    return rows_response(rows, list(BookingResponse.model_fields))
 
 @app.get("/api/customer/profile/bookings/status/{status}", response_model=List[BookingResponse])
 async def get_customer_bookings_by_status(
     status: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get bookings by status (pending, confirmed, rejected)"""
-    bookings = db.query(Booking).filter(
+    rows = await db.execute(select(*schema_columns(Booking, BookingResponse)).where(
         Booking.email == current_user.email,
         Booking.status == status
-    ).order_by(Booking.date.desc()).all()
-    return bookings
+    ).order_by(Booking.date.desc()))
+    return rows_response(rows, list(BookingResponse.model_fields))
 
 # ==================== ADMIN: Set User Password (New) ====================
 
@@ -980,7 +1262,7 @@ def admin_set_user_password(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user.hashed_password = get_password_hash(password_req.password)
+    user.hashed_password = hash_password_sync(password_req.password)
     db.commit()
     
     return {
@@ -1016,6 +1298,11 @@ def root():
 def health():
     return {"status": "healthy", "version": "3.0.0"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint (this worker's metrics)"""
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
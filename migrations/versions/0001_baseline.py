@@ -0,0 +1,131 @@
+"""Baseline: tables as originally created by Base.metadata.create_all
+
+Existing databases already have these tables, so each one is only created
+when missing and `alembic upgrade head` can run against them directly.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _missing(table: str) -> bool:
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade() -> None:
+    if _missing("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("username", sa.String(100), nullable=False),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("full_name", sa.String(200)),
+            sa.Column("phone", sa.String(50)),
+            sa.Column("date_of_birth", sa.String(50)),
+            sa.Column("nationality", sa.String(100)),
+            sa.Column("license_active", sa.Boolean()),
+            sa.Column("license_type", sa.String(50)),
+            sa.Column("license_expiry", sa.DateTime(timezone=True)),
+            sa.Column("user_folder", sa.String(500)),
+            sa.Column("hashed_password", sa.String(255)),
+            sa.Column("experience_years", sa.Integer()),
+            sa.Column("previous_roles", sa.Text()),
+            sa.Column("skills", sa.Text()),
+            sa.Column("preferred_country", sa.String(100)),
+            sa.Column("preferred_city", sa.String(100)),
+            sa.Column("cv_filename", sa.String(255)),
+            sa.Column("cv_path", sa.String(500)),
+            sa.Column("current_step", sa.Integer()),
+            sa.Column("registration_status", sa.String(50)),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True)),
+            sa.Column("last_login", sa.DateTime(timezone=True)),
+            sa.Column("admin_notes", sa.Text()),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if _missing("bookings"):
+        op.create_table(
+            "bookings",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+            sa.Column("name", sa.String(200), nullable=False),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("phone", sa.String(50), nullable=False),
+            sa.Column("purpose", sa.String(500)),
+            sa.Column("title", sa.String(200)),
+            sa.Column("description", sa.Text()),
+            sa.Column("booking_type", sa.String(100)),
+            sa.Column("date", sa.Date(), nullable=False),
+            sa.Column("time", sa.String(20), nullable=False),
+            sa.Column("duration_minutes", sa.Integer()),
+            sa.Column("status", sa.String(50)),
+            sa.Column("notification_sent", sa.Boolean()),
+            sa.Column("notification_date", sa.DateTime(timezone=True)),
+            sa.Column("reminder_sent", sa.Boolean()),
+            sa.Column("admin_response", sa.Text()),
+            sa.Column("confirmed_by", sa.String(100)),
+            sa.Column("confirmed_at", sa.DateTime(timezone=True)),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True)),
+        )
+        op.create_index("ix_bookings_id", "bookings", ["id"])
+        op.create_index("ix_bookings_user_id", "bookings", ["user_id"])
+        op.create_index("ix_bookings_date", "bookings", ["date"])
+
+    if _missing("gallery_images"):
+        op.create_table(
+            "gallery_images",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("filename", sa.String(255), nullable=False),
+            sa.Column("filepath", sa.String(500), nullable=False),
+            sa.Column("title", sa.String(200)),
+            sa.Column("description", sa.String(500)),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_gallery_images_id", "gallery_images", ["id"])
+
+    if _missing("user_documents"):
+        op.create_table(
+            "user_documents",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("filename", sa.String(255), nullable=False),
+            sa.Column("original_filename", sa.String(255)),
+            sa.Column("file_type", sa.String(100)),
+            sa.Column("file_size", sa.BigInteger()),
+            sa.Column("file_path", sa.String(500)),
+            sa.Column("file_data", sa.LargeBinary()),
+            sa.Column("category", sa.String(100)),
+            sa.Column("description", sa.String(500)),
+            sa.Column("uploaded_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True)),
+        )
+        op.create_index("ix_user_documents_id", "user_documents", ["id"])
+        op.create_index("ix_user_documents_user_id", "user_documents", ["user_id"])
+
+    if _missing("settings"):
+        op.create_table(
+            "settings",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("key", sa.String(100), nullable=False),
+            sa.Column("value", sa.JSON()),
+            sa.Column("description", sa.Text()),
+        )
+        op.create_index("ix_settings_id", "settings", ["id"])
+        op.create_index("ix_settings_key", "settings", ["key"], unique=True)
+
+
+def downgrade() -> None:
+    for table in ["settings", "user_documents", "gallery_images", "bookings", "users"]:
+        op.drop_table(table)
@@ -0,0 +1,31 @@
+"""Document storage: chunk table and content hash
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table("document_chunks"):
+        op.create_table(
+            "document_chunks",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("storage_key", sa.String(64), nullable=False),
+            sa.Column("seq", sa.Integer(), nullable=False),
+            sa.Column("data", sa.LargeBinary(), nullable=False),
+            sa.UniqueConstraint("storage_key", "seq", name="uq_document_chunks_key_seq"),
+        )
+    op.execute("ALTER TABLE user_documents ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)")
+
+
+def downgrade() -> None:
+    op.drop_column("user_documents", "content_hash")
+    op.drop_table("document_chunks")
@@ -0,0 +1,26 @@
+"""Materialized dashboard counters
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table("dashboard_stats"):
+        op.create_table(
+            "dashboard_stats",
+            sa.Column("name", sa.String(50), primary_key=True),
+            sa.Column("value", sa.BigInteger(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("dashboard_stats")
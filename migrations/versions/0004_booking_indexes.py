@@ -0,0 +1,34 @@
+"""Composite indexes for list pagination and the booking access patterns
+
+Built CONCURRENTLY so large production tables stay writable.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_users_created_at_id": "users (created_at, id)",
+    "ix_bookings_date_id": "bookings (date, id)",
+    "ix_bookings_status_date": "bookings (status, date)",
+    "ix_bookings_status_notification_sent": "bookings (status, notification_sent)",
+    "ix_bookings_email_status_date": "bookings (email, status, date)",
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, target in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
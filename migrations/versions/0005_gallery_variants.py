@@ -0,0 +1,24 @@
+"""Gallery image dimensions and derivative manifest
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE gallery_images ADD COLUMN IF NOT EXISTS width INTEGER")
+    op.execute("ALTER TABLE gallery_images ADD COLUMN IF NOT EXISTS height INTEGER")
+    op.execute("ALTER TABLE gallery_images ADD COLUMN IF NOT EXISTS variants JSON")
+
+
+def downgrade() -> None:
+    op.drop_column("gallery_images", "variants")
+    op.drop_column("gallery_images", "height")
+    op.drop_column("gallery_images", "width")
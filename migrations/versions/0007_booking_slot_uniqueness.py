@@ -0,0 +1,38 @@
+"""One active booking per (date, time) slot
+
+Partial unique index over pending/confirmed bookings, built CONCURRENTLY.
+Existing double bookings have to be resolved (rejected or moved) first.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+ACTIVE = "status IN ('pending', 'confirmed')"
+
+
+def upgrade() -> None:
+    clashes = op.get_bind().execute(text(
+        f"SELECT date, time, count(*) FROM bookings WHERE {ACTIVE} "
+        "GROUP BY date, time HAVING count(*) > 1 ORDER BY date, time LIMIT 20"
+    )).all()
+    if clashes:
+        listed = ", ".join(f"{day} {time} (x{count})" for day, time, count in clashes)
+        raise RuntimeError(f"Double-booked slots must be resolved before this migration: {listed}")
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_bookings_active_slot "
+            f"ON bookings (date, time) WHERE {ACTIVE}"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_bookings_active_slot")
@@ -0,0 +1,37 @@
+"""Delivery bookkeeping for the booking notification worker
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE bookings ADD COLUMN IF NOT EXISTS notification_attempts INTEGER NOT NULL DEFAULT 0")
+    op.execute("ALTER TABLE bookings ADD COLUMN IF NOT EXISTS notification_retry_at TIMESTAMPTZ")
+    op.execute("ALTER TABLE bookings ADD COLUMN IF NOT EXISTS notification_error TEXT")
+    # Decisions made before the worker existed must not all be emailed on first run
+    op.execute(
+        "UPDATE bookings SET notification_sent = true "
+        "WHERE notification_sent IS NOT true AND status IN ('confirmed', 'rejected')"
+    )
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bookings_notification_due "
+            "ON bookings (notification_retry_at) "
+            "WHERE notification_sent IS NOT true AND status IN ('confirmed', 'rejected')"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_bookings_notification_due")
+    op.drop_column("bookings", "notification_error")
+    op.drop_column("bookings", "notification_retry_at")
+    op.drop_column("bookings", "notification_attempts")
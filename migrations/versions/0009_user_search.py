@@ -0,0 +1,47 @@
+"""Candidate search: generated tsvector, GIN full-text and trigram indexes
+
+Adding a stored generated column rewrites the users table under an
+ACCESS EXCLUSIVE lock; run it in a quiet window on large installs.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(full_name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(skills, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(previous_roles, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(nationality, '') || ' ' || "
+    "coalesce(preferred_country, '') || ' ' || coalesce(preferred_city, '')), 'C')"
+)
+
+INDEXES = {
+    "ix_users_search_vector": "users USING gin (search_vector)",
+    "ix_users_full_name_trgm": "users USING gin (full_name gin_trgm_ops)",
+    "ix_users_email_trgm": "users USING gin (email gin_trgm_ops)",
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED"
+    )
+    with op.get_context().autocommit_block():
+        for name, target in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.drop_column("users", "search_vector")
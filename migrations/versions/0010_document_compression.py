@@ -0,0 +1,28 @@
+"""Compressed document storage: codec and stored size per document
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # NULL means "not checked yet"; python -m services.document_compression fills it in
+    op.execute("ALTER TABLE user_documents ADD COLUMN IF NOT EXISTS compression VARCHAR(10)")
+    op.execute("ALTER TABLE user_documents ADD COLUMN IF NOT EXISTS compressed_size BIGINT")
+
+
+def downgrade() -> None:
+    # Compressed rows would be unreadable without the codec column
+    op.execute(
+        "DO $$ BEGIN IF EXISTS (SELECT 1 FROM user_documents WHERE compression IN ('zstd', 'gzip')) THEN "
+        "RAISE EXCEPTION 'Compressed documents exist; decompress them before downgrading'; END IF; END $$"
+    )
+    op.drop_column("user_documents", "compressed_size")
+    op.drop_column("user_documents", "compression")
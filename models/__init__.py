@@ -2,6 +2,8 @@ from .user import User
 from .booking import Booking
 from .gallery import GalleryImage
 from .document import UserDocument
+from .document_chunk import DocumentChunk
 from .settings import Settings
+from .dashboard_stat import DashboardStat
 
-__all__ = ["User", "Booking", "GalleryImage", "UserDocument", "Settings"]
\ No newline at end of file
+__all__ = ["User", "Booking", "GalleryImage", "UserDocument", "DocumentChunk", "Settings", "DashboardStat"]
\ No newline at end of file
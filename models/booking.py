@@ -1,9 +1,29 @@
-from sqlalchemy import Column, Integer, String, DateTime, Date, Boolean, Text, ForeignKey
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, DateTime, Date, Boolean, Text, ForeignKey, Index
+from sqlalchemy.sql import func, text
 from database import Base
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Keyset pagination for the admin booking list
+        Index("ix_bookings_date_id", "date", "id"),
+        # Calendar today/upcoming
+        Index("ix_bookings_status_date", "status", "date"),
+        # Pending notifications
+        Index("ix_bookings_status_notification_sent", "status", "notification_sent"),
+        # Customer bookings by status
+        Index("ix_bookings_email_status_date", "email", "status", "date"),
+        # Decisions waiting to be sent by the notification worker
+        Index(
+            "ix_bookings_notification_due", "notification_retry_at",
+            postgresql_where=text("notification_sent IS NOT true AND status IN ('confirmed', 'rejected')")
+        ),
+        # One active (pending/confirmed) booking per slot
+        Index(
+            "uq_bookings_active_slot", "date", "time", unique=True,
+            postgresql_where=text("status IN ('pending', 'confirmed')")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
@@ -29,6 +49,10 @@ class Booking(Base):
     notification_sent = Column(Boolean, default=False)
     notification_date = Column(DateTime(timezone=True))
     reminder_sent = Column(Boolean, default=False)
+    # Delivery bookkeeping for services.notification_worker (reset after each sent message)
+    notification_attempts = Column(Integer, default=0, nullable=False, server_default="0")
+    notification_retry_at = Column(DateTime(timezone=True))
+    notification_error = Column(Text)
 
     # Admin Response
     admin_response = Column(Text)
@@ -0,0 +1,8 @@
+from sqlalchemy import Column, String, BigInteger
+from database import Base
+
+class DashboardStat(Base):
+    __tablename__ = "dashboard_stats"
+    
+    name = Column(String(50), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
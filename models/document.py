@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, LargeBinary, BigInteger
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from database import Base
 
@@ -12,9 +13,15 @@ class UserDocument(Base):
     original_filename = Column(String(255))
     file_type = Column(String(100))
     file_size = Column(BigInteger)
+    content_hash = Column(String(64))  # sha256 of the original bytes, used as ETag
+    # Stored bytes may be compressed: "zstd"/"gzip", "none" (checked, kept as-is)
+    # or NULL (not checked yet); file_size stays the original size
+    compression = Column(String(10))
+    compressed_size = Column(BigInteger)
     
     file_path = Column(String(500))
-    file_data = Column(LargeBinary)
+    # Deferred so listings and counts never pull the blob; load with undefer()
+    file_data = deferred(Column(LargeBinary))
     
     category = Column(String(100))
     description = Column(String(500))
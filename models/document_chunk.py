@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, UniqueConstraint
+from database import Base
+
+class DocumentChunk(Base):
+    __tablename__ = "document_chunks"
+    __table_args__ = (
+        UniqueConstraint("storage_key", "seq", name="uq_document_chunks_key_seq"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    storage_key = Column(String(64), nullable=False)
+    seq = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
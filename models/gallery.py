@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, JSON
 from sqlalchemy.sql import func
 from database import Base
 
@@ -11,4 +11,12 @@ class GalleryImage(Base):
     title = Column(String(200))
     description = Column(String(500))
     
+    # sha256 of the file; filepath is static/gallery/<content_hash><ext>
+    content_hash = Column(String(64))
+    
+    # Original dimensions and resized variants (see services/gallery_images.py)
+    width = Column(Integer)
+    height = Column(Integer)
+    variants = Column(JSON(none_as_null=True))
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,9 +1,30 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Index, Computed, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from database import Base
 
+# Weighted document for candidate search: names and skills first, then roles, then places
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(full_name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(skills, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(previous_roles, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(nationality, '') || ' ' || "
+    "coalesce(preferred_country, '') || ' ' || coalesce(preferred_city, '')), 'C')"
+)
+
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination for the admin user list
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # Candidate search: full text, plus fuzzy name / email matching
+        Index("ix_users_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_users_full_name_trgm", "full_name", postgresql_using="gin",
+              postgresql_ops={"full_name": "gin_trgm_ops"}),
+        Index("ix_users_email_trgm", "email", postgresql_using="gin",
+              postgresql_ops={"email": "gin_trgm_ops"}),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(100), unique=True, index=True, nullable=False)
@@ -46,3 +67,10 @@ class User(Base):
     
     # Admin notes
     admin_notes = Column(Text)
+    
+    # Maintained by Postgres; deferred so ordinary user loads never fetch it
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
+
+
+# The trigram indexes need pg_trgm before create_all builds them
+event.listen(User.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
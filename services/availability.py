@@ -0,0 +1,166 @@
+"""Open booking slots per day: configured time_slots minus overlapping active bookings.
+
+Booked intervals are cached per day and dropped by every booking write in this
+worker; other workers see changes after AVAILABILITY_CACHE_TTL_SECONDS. The
+uq_bookings_active_slot index is what actually prevents double booking.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import Booking
+from services.cache import TTLCache
+from services.settings_cache import get_setting
+
+# Bookings in these states hold their slot
+ACTIVE_STATUSES = ("pending", "confirmed")
+DEFAULT_SLOT_MINUTES = 60
+SLOT_CONSTRAINT = "uq_bookings_active_slot"
+
+_cache = TTLCache(maxsize=settings.AVAILABILITY_CACHE_MAXSIZE, ttl=settings.AVAILABILITY_CACHE_TTL_SECONDS)
+
+
+def to_minutes(value: str) -> Optional[int]:
+    """'09:00' / '9:00 AM' -> minutes after midnight; None if unparseable"""
+    for fmt in ("%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p"):
+        try:
+            parsed = datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+        return parsed.hour * 60 + parsed.minute
+    return None
+
+
+def canonical_time(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def slot_config() -> Tuple[List[str], int]:
+    """Configured slot start times and their length in minutes"""
+    setting = get_setting("time_slots") or {}
+    value = setting.get("value") or {}
+    return list(value.get("slots") or []), int(value.get("duration_minutes") or DEFAULT_SLOT_MINUTES)
+
+
+def resolve_slot(time: str) -> Tuple[str, int]:
+    """Canonical HH:MM start and length of the configured slot `time` names; 422 otherwise.
+
+    The unique index compares raw strings, so only canonical configured slots
+    may be stored ("9:00" and "09:00" must not both get in).
+    """
+    slots, slot_minutes = slot_config()
+    start = to_minutes(time)
+    if start is None or start not in {to_minutes(slot) for slot in slots}:
+        raise HTTPException(
+            status_code=422, detail=f"time must be one of the configured slots: {', '.join(slots)}"
+        )
+    return canonical_time(start), slot_minutes
+
+
+def _load_intervals(db: Session, days: List[date]) -> Dict[date, List[Tuple[str, int]]]:
+    """One grouped query for every requested day: distinct (time, duration) held per day"""
+    rows = db.execute(
+        select(Booking.date, Booking.time, Booking.duration_minutes, func.count())
+        .where(
+            Booking.date.in_(days),
+            Booking.status.in_(ACTIVE_STATUSES)
+        )
+        .group_by(Booking.date, Booking.time, Booking.duration_minutes)
+    ).all()
+    intervals = defaultdict(list)
+    for day, time, duration, _count in rows:
+        intervals[day].append((time, duration or DEFAULT_SLOT_MINUTES))
+    return {day: intervals.get(day, []) for day in days}
+
+
+def booked_intervals(db: Session, days: Iterable[date]) -> Dict[date, List[Tuple[str, int]]]:
+    """Booked (time, duration) pairs per day, cached; misses are loaded together"""
+    result = {}
+    missing = []
+    for day in days:
+        cached = _cache.get(day)
+        if cached is None:
+            missing.append(day)
+        else:
+            result[day] = cached
+    if missing:
+        for day, intervals in _load_intervals(db, missing).items():
+            _cache.set(day, intervals)
+            result[day] = intervals
+    return result
+
+
+def _overlaps(start: int, length: int, booked: List[Tuple[str, int]]) -> bool:
+    for time, duration in booked:
+        begin = to_minutes(time)
+        if begin is None:
+            continue
+        if begin < start + length and start < begin + duration:
+            return True
+    return False
+
+
+def get_availability(db: Session, date_from: date, date_to: date) -> List[dict]:
+    """[{date, slots: [{time, available}]}] for every day in the range"""
+    slots, slot_minutes = slot_config()
+    days = [date_from + timedelta(days=n) for n in range((date_to - date_from).days + 1)]
+    booked = booked_intervals(db, days)
+    now = datetime.now()
+    current = now.hour * 60 + now.minute
+
+    result = []
+    for day in days:
+        day_slots = []
+        for slot in slots:
+            start = to_minutes(slot)
+            available = (
+                start is not None
+                and day >= now.date()
+                and not (day == now.date() and start <= current)
+                and not _overlaps(start, slot_minutes, booked[day])
+            )
+            day_slots.append({"time": slot, "available": available})
+        result.append({"date": day, "slots": day_slots})
+    return result
+
+
+def slot_is_free(db: Session, day: date, time: str, duration: Optional[int] = None) -> bool:
+    """Fast pre-check before inserting; the unique index remains the real guard"""
+    start = to_minutes(time)
+    if start is None:
+        return False
+    # Read through: a stale cached "taken" must not turn a customer away
+    intervals = _load_intervals(db, [day])[day]
+    _cache.set(day, intervals)
+    return not _overlaps(start, duration or slot_config()[1], intervals)
+
+
+def is_slot_conflict(exc: IntegrityError) -> bool:
+    """True if the IntegrityError came from the active-slot unique index"""
+    diag = getattr(exc.orig, "diag", None)
+    return SLOT_CONSTRAINT in (getattr(diag, "constraint_name", None) or str(exc.orig))
+
+
+def invalidate_availability(*days: date) -> None:
+    for day in days:
+        if day is not None:
+            _cache.invalidate(day)
+
+
+def commit_booking_change(db: Session, *days: date) -> None:
+    """Commit a booking write; losing a slot race becomes a 409 instead of a 500"""
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        if is_slot_conflict(exc):
+            raise HTTPException(status_code=409, detail="This time slot is already booked")
+        raise
+    finally:
+        invalidate_availability(*days)
@@ -0,0 +1,124 @@
+"""Set-based admin batch updates: one UPDATE ... WHERE id = ANY(:ids) RETURNING per call."""
+from collections import Counter
+from typing import Dict, List
+
+from sqlalchemy import any_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import Booking, User
+from services.availability import commit_booking_change, is_slot_conflict
+from services.dashboard_stats import TRACKED_BOOKING_STATUSES, apply_stats_delta
+from services.principal_cache import invalidate_principal
+
+
+def _update_returning_previous(db: Session, model, ids: List[int], column, values: dict, returning: list):
+    """UPDATE the rows in `ids`, returning `returning` plus the previous value of `column` per row hit.
+
+    The previous values come from a locking CTE, so they are exact even with
+    concurrent writers, and the bulk UPDATE bypasses the ORM flush hooks.
+    """
+    previous = (
+        select(model.id, column.label("previous"))
+        .where(model.id == any_(ids))
+        .with_for_update()
+        .cte("previous")
+    )
+    stmt = (
+        update(model)
+        .where(model.id == previous.c.id)
+        .values(**values)
+        .returning(*returning, previous.c.previous)
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).all()
+
+
+def _outcomes(ids: List[int], found: Dict[int, dict]) -> List[dict]:
+    return [found.get(item_id, {"id": item_id, "outcome": "not_found"}) for item_id in ids]
+
+
+def _update_bookings_skipping_taken(db: Session, ids: List[int], values: dict, returning: list):
+    """Rows updated plus the ids left alone because their slot is held by another active booking.
+
+    The active-slot index fires on the UPDATE itself, so the set-based statement
+    runs in a savepoint; only when it clashes is each row retried in its own.
+    """
+    try:
+        with db.begin_nested():
+            return _update_returning_previous(db, Booking, ids, Booking.status, values, returning), []
+    except IntegrityError as exc:
+        if not is_slot_conflict(exc):
+            raise
+
+    rows, taken = [], []
+    for item_id in ids:
+        try:
+            with db.begin_nested():
+                rows.extend(
+                    _update_returning_previous(db, Booking, [item_id], Booking.status, values, returning)
+                )
+        except IntegrityError as exc:
+            if not is_slot_conflict(exc):
+                raise
+            taken.append(item_id)
+    return rows, taken
+
+
+def bulk_update_bookings(db: Session, ids: List[int], values: dict) -> dict:
+    """Apply `values` to every booking in `ids` in one transaction.
+
+    A booking that would re-take a slot another active booking now holds is
+    left unchanged and reported as "slot_taken".
+    """
+    ids = list(dict.fromkeys(ids))
+    rows, taken = _update_bookings_skipping_taken(
+        db, ids, values, [Booking.id, Booking.date, Booking.status]
+    )
+
+    deltas = Counter()
+    found = {}
+    for row in rows:
+        previous = row.previous or "pending"
+        if previous != row.status:
+            if previous in TRACKED_BOOKING_STATUSES:
+                deltas[f"bookings_{previous}"] -= 1
+            if row.status in TRACKED_BOOKING_STATUSES:
+                deltas[f"bookings_{row.status}"] += 1
+        found[row.id] = {
+            "id": row.id,
+            "outcome": "updated",
+            "previous_status": previous,
+            "status": row.status,
+        }
+    for item_id in taken:
+        found[item_id] = {"id": item_id, "outcome": "slot_taken"}
+    apply_stats_delta(db.connection(), deltas)
+    commit_booking_change(db, *{row.date for row in rows})
+    return {"updated": len(rows), "results": _outcomes(ids, found)}
+
+
+def bulk_set_license(db: Session, ids: List[int], license_active: bool) -> dict:
+    """Activate or deactivate many licenses in one transaction"""
+    ids = list(dict.fromkeys(ids))
+    rows = _update_returning_previous(
+        db, User, ids, User.license_active, {"license_active": license_active}, [User.id, User.email]
+    )
+
+    changed = 0
+    found = {}
+    for row in rows:
+        # NULL counts as inactive, like the dashboard recount and login
+        was_active = bool(row.previous)
+        if was_active != license_active:
+            changed += 1 if license_active else -1
+        found[row.id] = {
+            "id": row.id,
+            "outcome": "unchanged" if was_active == license_active else "updated",
+            "license_active": license_active,
+        }
+    apply_stats_delta(db.connection(), {"users_active": changed})
+    db.commit()
+    for row in rows:
+        invalidate_principal(row.email)
+    return {"updated": len(rows), "results": _outcomes(ids, found)}
@@ -0,0 +1,144 @@
+"""Keeps the in-memory CandidateMatrix in step with the users table.
+
+Built on first use from a streamed query. Profile writes in this worker
+update it row by row; each worker also rebuilds it from the database every
+MATCHING_REFRESH_SECONDS to pick up changes made by other workers. A rebuild
+runs in a background thread while requests keep using the current matrix,
+and writes made meanwhile are journaled and replayed onto the new one.
+"""
+import logging
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal
+from models import User
+from services.matching import CandidateFeatures, CandidateMatrix, Vacancy
+
+logger = logging.getLogger(__name__)
+
+FEATURE_COLUMNS = (User.id, User.skills, User.experience_years, User.preferred_country, User.preferred_city)
+
+_matrix: Optional[CandidateMatrix] = None
+_loaded_at = 0.0
+# One rebuild at a time
+_build_lock = threading.Lock()
+# Guards the swap and the journal
+_state_lock = threading.Lock()
+# (user_id, features or None for removal) written while a rebuild runs
+_journal: Optional[List[Tuple[int, Optional[CandidateFeatures]]]] = None
+
+
+def is_candidate(user) -> bool:
+    """Only licensed (admin-approved) users are matched"""
+    return bool(user.license_active)
+
+
+def _features(row) -> CandidateFeatures:
+    return CandidateFeatures(row.id, row.skills, row.experience_years, row.preferred_country, row.preferred_city)
+
+
+def _apply(matrix: CandidateMatrix, user_id: int, features: Optional[CandidateFeatures]) -> None:
+    if features is None:
+        matrix.remove(user_id)
+    else:
+        matrix.upsert(features)
+
+
+def build_matrix() -> CandidateMatrix:
+    matrix = CandidateMatrix(skill_columns=settings.MATCHING_SKILL_COLUMNS)
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(*FEATURE_COLUMNS)
+            .where(User.license_active == True)
+            .execution_options(yield_per=5000)
+        )
+        matrix.load(_features(row) for row in rows)
+    finally:
+        db.close()
+    return matrix
+
+
+def _rebuild() -> None:
+    global _matrix, _loaded_at, _journal
+    # Journal from before the query starts, so nothing committed meanwhile is missed
+    with _state_lock:
+        _journal = []
+    try:
+        matrix = build_matrix()
+    except BaseException:
+        with _state_lock:
+            _journal = None
+        raise
+    with _state_lock:
+        for user_id, features in _journal:
+            _apply(matrix, user_id, features)
+        _matrix, _loaded_at, _journal = matrix, time.monotonic(), None
+
+
+def _refresh_in_background() -> None:
+    try:
+        _rebuild()
+    except Exception:
+        logger.exception("Candidate matrix rebuild failed; serving the previous one")
+    finally:
+        _build_lock.release()
+
+
+def get_matrix() -> CandidateMatrix:
+    if _matrix is None:
+        # Nothing to serve yet, so the first build is waited for
+        with _build_lock:
+            if _matrix is None:
+                _rebuild()
+    elif time.monotonic() - _loaded_at > settings.MATCHING_REFRESH_SECONDS and _build_lock.acquire(blocking=False):
+        try:
+            threading.Thread(target=_refresh_in_background, name="candidate-matrix-refresh", daemon=True).start()
+        except BaseException:
+            _build_lock.release()
+            raise
+    return _matrix
+
+
+def _record(user_id: int, features: Optional[CandidateFeatures]) -> None:
+    with _state_lock:
+        if _matrix is not None:
+            _apply(_matrix, user_id, features)
+        if _journal is not None:
+            _journal.append((user_id, features))
+
+
+def sync_user(user: User) -> None:
+    """Call after committing a profile/licence change (no-op until the matrix is built)"""
+    _record(user.id, _features(user) if is_candidate(user) else None)
+
+
+def remove_user(user_id: int) -> None:
+    _record(user_id, None)
+
+
+def sync_users(db: Session, user_ids: Iterable[int]) -> None:
+    """Re-read a batch of users after a bulk update"""
+    if _matrix is None and _journal is None:
+        return
+    user_ids = list(user_ids)
+    rows = db.execute(select(*FEATURE_COLUMNS, User.license_active).where(User.id.in_(user_ids))).all()
+    seen = set()
+    for row in rows:
+        seen.add(row.id)
+        sync_user(row)
+    for user_id in set(user_ids) - seen:
+        remove_user(user_id)
+
+
+def match_vacancy(vacancy: Vacancy, limit: int, min_score: float = 0.0):
+    return get_matrix().top_k(vacancy, limit, min_score)
+
+
+def matched_skills(user_id: int, vacancy: Vacancy):
+    return get_matrix().matched_skills(user_id, vacancy)
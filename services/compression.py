@@ -0,0 +1,119 @@
+"""Stored-document compression: codecs, the per-type policy and streaming (de)compressors.
+
+Documents are compressed as one zstd frame (or one gzip member) while they are
+written, and decompressed chunk by chunk on the way out. file_size and
+content_hash always describe the original bytes, so ETags, Content-Length and
+byte ranges do not change when a document is compressed.
+
+zstd needs the optional `zstandard` package; without it new writes fall back
+to gzip (rows already stored as zstd then fail loudly on read).
+"""
+import re
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from config import settings
+
+try:
+    import zstandard
+except ImportError:  # gzip (zlib) is always available
+    zstandard = None
+
+ZSTD = "zstd"
+GZIP = "gzip"
+# Checked and deliberately stored as-is, so the backfill does not look at it again
+NONE = "none"
+CODECS = (ZSTD, GZIP)
+
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+DEFAULT_LEVELS = {ZSTD: 3, GZIP: 6}
+
+# Formats that are already compressed (images, media, archives, OOXML/ODF
+# containers, PDF streams); recompressing them only burns CPU
+ALREADY_COMPRESSED_TYPES = re.compile(
+    r"^(image/(?!svg|bmp|tiff)|video/|audio/|application/(pdf|zip|gzip|x-gzip|zstd|x-7z|x-rar|x-bzip2|x-xz"
+    r"|vnd\.openxmlformats|vnd\.oasis\.opendocument|epub))"
+)
+ALREADY_COMPRESSED_EXTENSIONS = {
+    "jpg", "jpeg", "png", "gif", "webp", "heic", "avif", "mp3", "mp4", "mov", "zip", "gz", "tgz", "7z", "rar",
+    "bz2", "xz", "zst", "docx", "xlsx", "pptx", "odt", "ods", "pdf", "epub",
+}
+
+
+def preferred_codec() -> Optional[str]:
+    """Codec for new writes from DOCUMENT_COMPRESSION ("auto", "zstd", "gzip" or "none")"""
+    choice = settings.DOCUMENT_COMPRESSION
+    if choice == NONE:
+        return None
+    if choice in ("auto", ZSTD):
+        return ZSTD if zstandard is not None else GZIP
+    if choice == GZIP:
+        return GZIP
+    raise ValueError(f"Unknown DOCUMENT_COMPRESSION: {choice}")
+
+
+def type_is_compressible(content_type: Optional[str], filename: Optional[str]) -> bool:
+    if ALREADY_COMPRESSED_TYPES.match((content_type or "").lower()):
+        return False
+    extension = (filename or "").rpartition(".")[2].lower()
+    return extension not in ALREADY_COMPRESSED_EXTENSIONS
+
+
+def compressor(codec: str):
+    """Object with compress(chunk) -> bytes and flush() -> bytes"""
+    level = settings.DOCUMENT_COMPRESSION_LEVEL or DEFAULT_LEVELS[codec]
+    if codec == GZIP:
+        return zlib.compressobj(level, zlib.DEFLATED, _GZIP_WBITS)
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd compression needs the zstandard package")
+        return zstandard.ZstdCompressor(level=level).compressobj()
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+def decompressor(codec: str):
+    if codec == GZIP:
+        return zlib.decompressobj(_GZIP_WBITS)
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Reading zstd-compressed documents needs the zstandard package")
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+def choose_codec(content_type: Optional[str], filename: Optional[str], sample: bytes) -> Optional[str]:
+    """Codec for a document, or None to store it as-is.
+
+    Skips already-compressed types, then test-compresses the first chunk: a
+    sample that saves less than DOCUMENT_COMPRESSION_MIN_SAVING (say an
+    encrypted or image-only file with a generic type) is stored raw.
+    """
+    codec = preferred_codec()
+    if codec is None or not sample or not type_is_compressible(content_type, filename):
+        return None
+    probe = compressor(codec)
+    compressed = len(probe.compress(sample)) + len(probe.flush())
+    if compressed > len(sample) * (1 - settings.DOCUMENT_COMPRESSION_MIN_SAVING):
+        return None
+    return codec
+
+
+def compress_stream(chunks: Iterable[bytes], codec: str) -> Iterator[bytes]:
+    engine = compressor(codec)
+    for chunk in chunks:
+        data = engine.compress(chunk)
+        if data:
+            yield data
+    yield engine.flush()
+
+
+def decompress_stream(chunks: Iterable[bytes], codec: str) -> Iterator[bytes]:
+    engine = decompressor(codec)
+    for chunk in chunks:
+        data = engine.decompress(chunk)
+        if data:
+            yield data
+    if codec == GZIP:
+        tail = engine.flush()
+        if tail:
+            yield tail
@@ -0,0 +1,224 @@
+"""Dashboard counters: one aggregate query, or an incrementally maintained table.
+
+Refresh the materialized counters by hand with:
+    python -m services.dashboard_stats
+"""
+import logging
+import threading
+from collections import Counter
+from typing import Dict
+
+from sqlalchemy import event, func, inspect, select, true, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal
+from models import Booking, DashboardStat, User, UserDocument
+
+logger = logging.getLogger(__name__)
+
+STAT_NAMES = [
+    "users_total", "users_active",
+    "bookings_total", "bookings_pending", "bookings_confirmed", "bookings_completed",
+    "documents_total",
+]
+TRACKED_BOOKING_STATUSES = ("pending", "confirmed", "completed")
+
+
+def compute_stats(db: Session) -> Dict[str, int]:
+    """Every counter in one round trip (COUNT ... FILTER per table, joined)"""
+    users = select(
+        func.count(User.id).label("users_total"),
+        func.count(User.id).filter(User.license_active == True).label("users_active"),
+    ).subquery()
+    bookings = select(
+        func.count(Booking.id).label("bookings_total"),
+        *[
+            func.count(Booking.id).filter(Booking.status == status).label(f"bookings_{status}")
+            for status in TRACKED_BOOKING_STATUSES
+        ],
+    ).subquery()
+    documents = select(func.count(UserDocument.id).label("documents_total")).subquery()
+
+    row = db.execute(
+        select(users, bookings, documents)
+        .select_from(users.join(bookings, true()).join(documents, true()))
+    ).one()
+    return {name: row._mapping[name] for name in STAT_NAMES}
+
+
+def read_materialized(db: Session) -> Dict[str, int]:
+    rows = dict(db.execute(select(DashboardStat.name, DashboardStat.value)).all())
+    if len(rows) < len(STAT_NAMES):
+        # A replica session cannot seed the table; count directly instead
+        return compute_stats(db) if db.info.get("read_only") else refresh_materialized(db)
+    return {name: rows[name] for name in STAT_NAMES}
+
+
+def refresh_materialized(db: Session) -> Dict[str, int]:
+    """Recount everything into dashboard_stats"""
+    db.execute(
+        insert(DashboardStat)
+        .values([{"name": name, "value": 0} for name in STAT_NAMES])
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+    # Lock the counters before counting: writers that commit after our snapshot
+    # block on their increment until we are done, so nothing is lost.
+    db.execute(select(DashboardStat.name).with_for_update())
+    counts = compute_stats(db)
+    for name, value in counts.items():
+        db.execute(update(DashboardStat).where(DashboardStat.name == name).values(value=value))
+    db.commit()
+    return counts
+
+
+def get_dashboard_stats(db: Session) -> dict:
+    counts = read_materialized(db) if settings.DASHBOARD_STATS_MATERIALIZED else compute_stats(db)
+    return {
+        "users": {
+            "total": counts["users_total"],
+            "active": counts["users_active"],
+            "inactive": counts["users_total"] - counts["users_active"]
+        },
+        "bookings": {
+            "total": counts["bookings_total"],
+            "pending": counts["bookings_pending"],
+            "confirmed": counts["bookings_confirmed"],
+            "completed": counts["bookings_completed"]
+        },
+        "documents": {
+            "total": counts["documents_total"]
+        }
+    }
+
+
+def apply_stats_delta(connection, deltas: Dict[str, int]) -> None:
+    """Add deltas to the counters inside the caller's transaction"""
+    if not settings.DASHBOARD_STATS_MATERIALIZED:
+        return
+    for name, delta in deltas.items():
+        if delta:
+            connection.execute(
+                update(DashboardStat).where(DashboardStat.name == name).values(value=DashboardStat.value + delta)
+            )
+
+
+# ---- write-path maintenance -------------------------------------------------
+
+class _UnknownPrevious(Exception):
+    pass
+
+
+def _previous(obj, attr: str, default):
+    """Value of attr before this flush"""
+    history = inspect(obj).attrs[attr].history
+    if not history.has_changes():
+        value = getattr(obj, attr)
+    elif history.deleted:
+        value = history.deleted[0]
+    else:
+        # Attribute was never loaded, the old value is unknown
+        raise _UnknownPrevious()
+    return default if value is None else value
+
+
+def _counts(obj, values) -> Counter:
+    if isinstance(obj, User):
+        return Counter(users_total=1, users_active=1 if values.get("license_active") else 0)
+    if isinstance(obj, Booking):
+        counts = Counter(bookings_total=1)
+        status = values.get("status") or "pending"
+        if status in TRACKED_BOOKING_STATUSES:
+            counts[f"bookings_{status}"] += 1
+        return counts
+    if isinstance(obj, UserDocument):
+        return Counter(documents_total=1)
+    return Counter()
+
+
+# NULL license_active counts as inactive everywhere, as in compute_stats and login
+def _current(obj) -> dict:
+    if isinstance(obj, User):
+        return {"license_active": bool(obj.license_active)}
+    if isinstance(obj, Booking):
+        return {"status": obj.status}
+    return {}
+
+
+def _old(obj) -> dict:
+    if isinstance(obj, User):
+        return {"license_active": _previous(obj, "license_active", False)}
+    if isinstance(obj, Booking):
+        return {"status": _previous(obj, "status", "pending")}
+    return {}
+
+
+@event.listens_for(Session, "after_flush")
+def _track_stats(session, flush_context):
+    if not settings.DASHBOARD_STATS_MATERIALIZED:
+        return
+    deltas = Counter()
+    try:
+        for obj in session.new:
+            deltas.update(_counts(obj, _current(obj)))
+        for obj in session.deleted:
+            deltas.subtract(_counts(obj, _old(obj)))
+        for obj in session.dirty:
+            if isinstance(obj, (User, Booking)) and session.is_modified(obj):
+                deltas.subtract(_counts(obj, _old(obj)))
+                deltas.update(_counts(obj, _current(obj)))
+    except _UnknownPrevious:
+        session.info["dashboard_stats_stale"] = True
+        return
+    apply_stats_delta(session.connection(), deltas)
+
+
+# One background recount at a time; requests made while it runs trigger one more
+_refresh_lock = threading.Lock()
+_refresh_requested = threading.Event()
+
+
+def _refresh_in_background() -> None:
+    try:
+        while _refresh_requested.is_set():
+            _refresh_requested.clear()
+            db = SessionLocal()
+            try:
+                refresh_materialized(db)
+            except Exception:
+                logger.exception("Dashboard stats refresh failed")
+            finally:
+                db.close()
+    finally:
+        _refresh_lock.release()
+    # A request that arrived between the last check and the release
+    if _refresh_requested.is_set():
+        schedule_refresh()
+
+
+def schedule_refresh() -> None:
+    """Recount the materialized counters in a background thread, off the caller's path"""
+    _refresh_requested.set()
+    if not _refresh_lock.acquire(blocking=False):
+        return
+    try:
+        threading.Thread(target=_refresh_in_background, name="dashboard-stats-refresh", daemon=True).start()
+    except BaseException:
+        _refresh_lock.release()
+        raise
+
+
+@event.listens_for(Session, "after_commit")
+def _refresh_if_stale(session):
+    # Also fires for AsyncSession commits, on the event loop: never query here
+    if session.info.pop("dashboard_stats_stale", False):
+        schedule_refresh()
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        print(refresh_materialized(db))
+    finally:
+        db.close()
@@ -0,0 +1,131 @@
+"""Compress documents stored before compression existed (rows with compression NULL).
+
+Usage:
+    python -m services.document_compression [--batch-size 50] [--dry-run]
+
+Each batch writes a compressed copy, checks it decompresses to the recorded
+sha256, points the row at it and only then deletes the old bytes. Rows whose
+type or sample does not compress are marked "none" without being rewritten.
+Legacy file_data blobs are compressed when services.document_migration moves them.
+"""
+import argparse
+import hashlib
+
+from sqlalchemy import select, update
+
+from config import settings
+from database import SessionLocal
+from models import User, UserDocument
+from services.compression import NONE, choose_codec, decompress_stream, preferred_codec
+from services.storage import StoredObject, storage_for_path, store_document
+
+
+def _digest(chunks) -> str:
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _mark(db, doc_id: int, values: dict) -> bool:
+    """Update one row unless it changed since it was read; keeps updated_at (and so the ETag) as is"""
+    result = db.execute(
+        update(UserDocument)
+        .where(UserDocument.id == doc_id, UserDocument.compression.is_(None))
+        .values(**values, updated_at=UserDocument.updated_at)
+    )
+    return result.rowcount == 1
+
+
+def compress_documents(batch_size: int = 50, dry_run: bool = False) -> dict:
+    """Recompress batch by batch (keyset on id); returns counts and bytes saved"""
+    if preferred_codec() is None:
+        raise SystemExit("DOCUMENT_COMPRESSION is 'none'; nothing to do")
+    stats = {"compressed": 0, "skipped": 0, "bytes_before": 0, "bytes_after": 0}
+    last_id = 0
+    while True:
+        db = SessionLocal()
+        written, replaced = [], []
+        try:
+            rows = db.execute(
+                select(
+                    UserDocument.id, UserDocument.file_path, UserDocument.file_type, UserDocument.filename,
+                    UserDocument.file_size, UserDocument.content_hash, User.user_folder
+                )
+                .join(User, User.id == UserDocument.user_id)
+                .where(
+                    UserDocument.id > last_id,
+                    UserDocument.compression.is_(None),
+                    UserDocument.file_path.isnot(None)
+                )
+                .order_by(UserDocument.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return stats
+            last_id = rows[-1].id
+
+            for row in rows:
+                storage = storage_for_path(row.file_path)
+                sample = b"".join(storage.iter_chunks(row.file_path, 0, settings.DOCUMENT_CHUNK_SIZE))
+                if choose_codec(row.file_type, row.filename, sample) is None:
+                    stats["skipped"] += 1
+                    if not dry_run:
+                        _mark(db, row.id, {"compression": NONE})
+                    continue
+                if dry_run:
+                    stats["compressed"] += 1
+                    continue
+
+                stored: StoredObject = store_document(
+                    storage.iter_chunks(row.file_path), row.user_folder, row.file_type, row.filename, storage
+                )
+                written.append((storage, stored.path))
+                # The probe only saw the first chunk; keep the original if the whole file did not shrink
+                if stored.compression == NONE or stored.stored_size >= stored.size:
+                    storage.delete(written.pop()[1])
+                    stats["skipped"] += 1
+                    _mark(db, row.id, {"compression": NONE})
+                    continue
+                expected = row.content_hash or stored.sha256
+                if _digest(decompress_stream(storage.iter_chunks(stored.path), stored.compression)) != expected:
+                    raise RuntimeError(f"Document {row.id}: compressed copy does not match content_hash")
+                if _mark(db, row.id, {
+                    "file_path": stored.path,
+                    "file_size": stored.size,
+                    "content_hash": stored.sha256,
+                    "compression": stored.compression,
+                    "compressed_size": stored.stored_size,
+                }):
+                    replaced.append((storage, row.file_path))
+                    stats["compressed"] += 1
+                    stats["bytes_before"] += stored.size
+                    stats["bytes_after"] += stored.stored_size
+                else:
+                    storage.delete(written.pop()[1])
+            db.commit()
+            written.clear()
+            # Old bytes go only after the rows point at the new copies
+            for storage, path in replaced:
+                storage.delete(path)
+            print(f"Up to id {last_id}: {stats['compressed']} compressed, {stats['skipped']} kept as-is")
+        except BaseException:
+            db.rollback()
+            for storage, path in written:
+                storage.delete(path)
+            raise
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--dry-run", action="store_true", help="report what would be compressed, change nothing")
+    args = parser.parse_args()
+    result = compress_documents(args.batch_size, args.dry_run)
+    saved = result["bytes_before"] - result["bytes_after"]
+    print(
+        f"Done: {result['compressed']} compressed, {result['skipped']} kept as-is, "
+        f"{saved / 1024 / 1024:.1f} MiB saved"
+    )
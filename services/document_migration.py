@@ -0,0 +1,66 @@
+"""Move legacy user_documents.file_data blobs into document storage.
+
+Usage:
+    python -m services.document_migration [--batch-size 20] [--backend filesystem]
+"""
+import argparse
+
+from sqlalchemy import select, update
+
+from database import SessionLocal
+from models import User, UserDocument
+from services.storage import get_storage, iter_legacy_blob, store_document
+
+
+def migrate_documents(batch_size: int = 20, backend: str = None) -> int:
+    """Copy blobs out of the table batch by batch; returns the number of documents moved"""
+    storage = get_storage(backend)
+    moved = 0
+    while True:
+        db = SessionLocal()
+        written = []
+        try:
+            rows = db.execute(
+                select(UserDocument.id, UserDocument.file_type, UserDocument.filename, User.user_folder)
+                .join(User, User.id == UserDocument.user_id)
+                .where(UserDocument.file_path.is_(None), UserDocument.file_data.isnot(None))
+                .order_by(UserDocument.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return moved
+
+            for doc_id, file_type, filename, folder in rows:
+                # Compressed on the way out, per the DOCUMENT_COMPRESSION policy
+                stored = store_document(iter_legacy_blob(doc_id), folder, file_type, filename, storage)
+                written.append(stored.path)
+                db.execute(
+                    update(UserDocument)
+                    .where(UserDocument.id == doc_id)
+                    .values(
+                        file_path=stored.path,
+                        file_size=stored.size,
+                        content_hash=stored.sha256,
+                        compression=stored.compression,
+                        compressed_size=stored.stored_size,
+                        file_data=None
+                    )
+                )
+            db.commit()
+            moved += len(rows)
+            print(f"Moved {moved} documents")
+        except BaseException:
+            db.rollback()
+            for path in written:
+                storage.delete(path)
+            raise
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--backend", choices=["filesystem", "database"], default=None)
+    args = parser.parse_args()
+    print(f"Done, {migrate_documents(args.batch_size, args.backend)} documents moved")
@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Iterator, List
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from config import settings
+from database import SessionLocal
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Default columns per export; `fields=` may pick any subset. Secrets and blobs are never exported.
+USER_EXPORT_FIELDS = [
+    "id", "username", "email", "full_name", "phone", "date_of_birth", "nationality",
+    "license_active", "license_type", "license_expiry", "experience_years", "previous_roles",
+    "skills", "preferred_country", "preferred_city", "current_step", "registration_status",
+    "created_at", "updated_at", "last_login",
+]
+BOOKING_EXPORT_FIELDS = [
+    "id", "user_id", "name", "email", "phone", "purpose", "date", "time", "duration_minutes",
+    "status", "notification_sent", "admin_response", "confirmed_by", "confirmed_at", "created_at",
+]
+DOCUMENT_EXPORT_FIELDS = [
+    "id", "user_id", "filename", "original_filename", "file_type", "file_size", "compressed_size",
+    "compression", "content_hash", "category", "description", "uploaded_at",
+]
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _iter_batches(stmt) -> Iterator[List]:
+    """Rows from a server-side cursor, EXPORT_BATCH_SIZE at a time"""
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        for batch in result.partitions():
+            yield batch
+    finally:
+        db.close()
+
+
+def iter_csv(stmt, names: List[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    yield buffer.getvalue().encode()
+    for batch in _iter_batches(stmt):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [v.isoformat() if isinstance(v, (date, datetime)) else v for v in row] for row in batch
+        )
+        yield buffer.getvalue().encode()
+
+
+def iter_ndjson(stmt, names: List[str]) -> Iterator[bytes]:
+    for batch in _iter_batches(stmt):
+        yield "".join(
+            json.dumps(dict(zip(names, row)), default=_json_default) + "\n" for row in batch
+        ).encode()
+
+
+def export_response(model, names: List[str], conditions: list, fmt: str, filename: str) -> StreamingResponse:
+    """Stream `names` columns of `model` (ordered by id) as CSV or NDJSON, without buffering"""
+    stmt = select(*[getattr(model, name) for name in names]).where(*conditions).order_by(model.id)
+    body = iter_csv(stmt, names) if fmt == "csv" else iter_ndjson(stmt, names)
+    stamp = date.today().strftime("%Y%m%d")
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename={filename}-{stamp}.{fmt}"}
+    )
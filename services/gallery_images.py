@@ -0,0 +1,219 @@
+"""Content-addressed gallery files, their resized derivatives and the srcset manifest.
+
+Backfill images uploaded before the pipeline existed with:
+    python -m services.gallery_images
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from PIL import Image, ImageOps
+from sqlalchemy import func, or_, select
+
+from config import settings
+from database import SessionLocal
+from models import GalleryImage
+from services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+GALLERY_DIR = "static/gallery"
+DERIVED_DIR = "static/gallery/derived"
+
+# name -> (max width, Pillow format); each width is produced as JPEG and WebP
+VARIANTS = {
+    "thumb": (320, "JPEG"),
+    "thumb_webp": (320, "WEBP"),
+    "medium": (1024, "JPEG"),
+    "medium_webp": (1024, "WEBP"),
+    "large": (1920, "JPEG"),
+    "large_webp": (1920, "WEBP"),
+}
+MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+# Stored file extension per detected format, so the content address never depends on the client's filename
+FORMAT_EXTENSIONS = {
+    "JPEG": ".jpg", "PNG": ".png", "GIF": ".gif", "WEBP": ".webp",
+    "BMP": ".bmp", "TIFF": ".tif", "ICO": ".ico", "MPO": ".jpg",
+}
+SAVE_OPTIONS = {
+    "JPEG": {"quality": 80, "optimize": True, "progressive": True},
+    "WEBP": {"quality": 80, "method": 4},
+}
+
+
+# Columns behind GalleryResponse; the public listing is cached as plain dicts
+LISTING_FIELDS = ("id", "filename", "filepath", "title", "description", "width", "height", "variants", "created_at")
+_listing = TTLCache(maxsize=1, ttl=settings.GALLERY_CACHE_TTL_SECONDS)
+
+
+class StagedImage(NamedTuple):
+    content_hash: str
+    temp_path: str
+    path: str
+
+
+def detected_extension(path: str) -> str:
+    """Extension for the image format Pillow detects in the file ('' if it is not a known image)"""
+    try:
+        with Image.open(path) as image:
+            return FORMAT_EXTENSIONS.get(image.format, "")
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return ""
+
+
+def stage_upload(fileobj) -> StagedImage:
+    """Copy an upload to a temp file while hashing it; publish() moves it to its hashed name.
+
+    The name is the hash plus the extension of the detected format, so the same
+    bytes always get one address whatever the client called the file.
+    """
+    os.makedirs(GALLERY_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    fd, temp_path = tempfile.mkstemp(dir=GALLERY_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: fileobj.read(1024 * 1024), b""):
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    content_hash = digest.hexdigest()
+    return StagedImage(content_hash, temp_path, f"{GALLERY_DIR}/{content_hash}{detected_extension(temp_path)}")
+
+
+def publish(staged: StagedImage) -> None:
+    """Atomically put the staged bytes at their content address (identical if it already exists)"""
+    os.replace(staged.temp_path, staged.path)
+
+
+def path_lock(path: str):
+    """Transaction-scoped advisory lock serialising uploads and deletes of one stored file"""
+    return select(func.pg_advisory_xact_lock(func.hashtext(path)))
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """JPEG has no alpha: composite transparent images onto white"""
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def render_variants(source_path: str, stem: str) -> Dict[str, dict]:
+    """Write every variant of one image; returns the manifest stored on GalleryImage.variants"""
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    with Image.open(source_path) as original:
+        image = _flatten(ImageOps.exif_transpose(original))
+
+    variants = {}
+    rendered = {}
+    for name, (max_width, fmt) in VARIANTS.items():
+        # Never upscale; small originals reuse one file for several variant names
+        width = min(max_width, image.width)
+        if (width, fmt) not in rendered:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            path = f"{DERIVED_DIR}/{stem}_{name}.{fmt.lower()}"
+            resized.save(path, fmt, **SAVE_OPTIONS[fmt])
+            rendered[(width, fmt)] = {
+                "path": path,
+                "width": width,
+                "height": height,
+                "type": MIME_TYPES[fmt],
+                "bytes": os.path.getsize(path),
+            }
+        variants[name] = rendered[(width, fmt)]
+    return variants
+
+
+def generate_derivatives(image_id: int) -> None:
+    """Background task: build the variants for one gallery image and record them"""
+    db = SessionLocal()
+    try:
+        image = db.query(GalleryImage).filter(GalleryImage.id == image_id).first()
+        if not image or not os.path.exists(image.filepath):
+            return
+        # Duplicate upload of an already processed file: reuse its variants
+        # (also matched on the hash, so files stored under an older naming scheme count too)
+        twin = db.query(GalleryImage).filter(
+            or_(GalleryImage.filepath == image.filepath, GalleryImage.content_hash == image.content_hash),
+            GalleryImage.id != image.id,
+            GalleryImage.variants.isnot(None)
+        ).first()
+        if twin:
+            image.width, image.height, image.variants = twin.width, twin.height, twin.variants
+            db.commit()
+            return
+        try:
+            variants = render_variants(image.filepath, Path(image.filepath).stem)
+            with Image.open(image.filepath) as original:
+                image.width, image.height = ImageOps.exif_transpose(original).size
+        except Exception:
+            # Keep serving the original if Pillow cannot handle the upload
+            logger.exception("Could not build derivatives for gallery image %s", image_id)
+            return
+        image.variants = variants
+        db.commit()
+    finally:
+        db.close()
+        invalidate_gallery_listing()
+
+
+def delete_derivatives(variants: Optional[dict]) -> None:
+    for path in {variant["path"] for variant in (variants or {}).values()}:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def build_srcset(variants: Optional[dict]) -> Optional[Dict[str, str]]:
+    """{mime type: "path 320w, path 1024w, ..."} for <picture>/<source srcset>"""
+    if not variants:
+        return None
+    by_type: Dict[str, Dict[int, str]] = {}
+    for variant in variants.values():
+        by_type.setdefault(variant["type"], {}).setdefault(variant["width"], variant["path"])
+    return {
+        mime: ", ".join(f"{path} {width}w" for width, path in sorted(widths.items()))
+        for mime, widths in by_type.items()
+    }
+
+
+def _load_listing() -> List[dict]:
+    db = SessionLocal()
+    try:
+        rows = db.execute(select(*[getattr(GalleryImage, name) for name in LISTING_FIELDS]))
+        items = [dict(zip(LISTING_FIELDS, row)) for row in rows]
+    finally:
+        db.close()
+    for item in items:
+        item["srcset"] = build_srcset(item["variants"])
+    return items
+
+
+def gallery_listing() -> List[dict]:
+    """Cached GalleryResponse-shaped dicts for the public gallery.
+
+    Writes in this worker invalidate it; other workers catch up within the TTL.
+    """
+    return _listing.get_or_load("all", _load_listing)
+
+
+def invalidate_gallery_listing() -> None:
+    _listing.invalidate("all")
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        pending = [row.id for row in db.query(GalleryImage.id).filter(GalleryImage.variants.is_(None))]
+    finally:
+        db.close()
+    for image_id in pending:
+        generate_derivatives(image_id)
+    print(f"Processed {len(pending)} gallery images")
@@ -0,0 +1,144 @@
+import re
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+
+from models import UserDocument
+from services.storage import iter_document
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# <sha256>[_variant].<ext>: the URL changes whenever the bytes do
+_CONTENT_ADDRESSED_RE = re.compile(r"(^|/)[0-9a-f]{64}(_[a-z0-9_]+)?\.[a-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def document_etag(doc: UserDocument) -> str:
+    """Strong ETag from the content hash; weak fallback for rows stored before hashing"""
+    if doc.content_hash:
+        return f'"{doc.content_hash}"'
+    stamp = doc.updated_at or doc.uploaded_at
+    return f'W/"{doc.id}-{doc.file_size or 0}-{int(stamp.timestamp()) if stamp else 0}"'
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single `bytes=` range into inclusive (start, end); None means send everything"""
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        # Multi-range and malformed headers are ignored, which RFC 9110 allows
+        return None
+
+    if size == 0:
+        # No byte of an empty representation can be selected
+        raise RangeNotSatisfiable()
+
+    first, last = match.group(1), match.group(2)
+    if not first:
+        suffix = int(last)
+        if suffix == 0:
+            raise RangeNotSatisfiable()
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison, as required for If-None-Match"""
+    if header.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def _if_range_matches(header: str, etag: str) -> bool:
+    """Strong comparison, as RFC 9110 requires for If-Range; weak ETags never match"""
+    return not etag.startswith("W/") and header.strip() == etag
+
+
+def _not_modified_since(header: str, last_modified: Optional[datetime]) -> bool:
+    if last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return int(last_modified.timestamp()) <= int(since.timestamp())
+
+
+def document_response(request: Request, doc: UserDocument, disposition: str = "inline") -> Response:
+    """Serve a stored document with ETag/Last-Modified revalidation and single byte ranges"""
+    etag = document_etag(doc)
+    last_modified = doc.updated_at or doc.uploaded_at
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Accept-Ranges": "bytes",
+    }
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    # If-None-Match takes precedence over If-Modified-Since
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if (if_none_match and _etag_matches(if_none_match, etag)) or (
+        not if_none_match and if_modified_since and _not_modified_since(if_modified_since, last_modified)
+    ):
+        return Response(status_code=304, headers=headers)
+
+    size = doc.file_size
+    media_type = doc.file_type or "application/octet-stream"
+    headers["Content-Disposition"] = f"{disposition}; filename={doc.filename}"
+
+    byte_range = None
+    if size is not None:
+        # A stale (or weak, or date) If-Range validator means "send the whole thing"
+        if_range = request.headers.get("if-range")
+        if not if_range or _if_range_matches(if_range, etag):
+            try:
+                byte_range = parse_range(request.headers.get("range"), size)
+            except RangeNotSatisfiable:
+                return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        headers["Content-Length"] = str(size)
+
+    if byte_range is None:
+        return StreamingResponse(iter_document(doc), media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    length = end - start + 1
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        iter_document(doc, start, length),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that marks content-addressed files as immutable for browsers and CDNs"""
+
+    async def get_response(self, path: str, scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304) and _CONTENT_ADDRESSED_RE.search(path):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
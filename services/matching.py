@@ -0,0 +1,249 @@
+"""NumPy candidate matrix and vectorized vacancy scoring.
+
+Pure in-memory engine with no database or settings access, so benchmarks can
+drive it directly; services.candidate_index keeps it in sync with the users table.
+
+Each candidate is one row:
+  skills      int32[width]  skill phrase ids, padded with 0 (never a real phrase);
+              the matrix widens when a candidate has more phrases than it holds
+  experience  float32            years
+  country     int32              location vocabulary id (0 = unknown)
+  city        int32
+  active      bool               False for free / removed slots
+A vacancy is scored against every row in one pass: skill coverage through a
+boolean lookup over the padded id matrix, plus experience and location terms.
+When the vacancy lists skills, candidates sharing none of them are not ranked.
+"""
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+_SPLIT_RE = re.compile(r"[,;/|\n]+")
+_WORD_RE = re.compile(r"[a-z0-9+#.]+")
+
+DEFAULT_WEIGHTS = {"skills": 0.7, "experience": 0.2, "location": 0.1}
+
+
+def tokenize_skills(text: Optional[str]) -> List[str]:
+    """'Forklift  driving, Python' -> ['forklift driving', 'python']"""
+    phrases = []
+    for phrase in _SPLIT_RE.split((text or "").lower()):
+        words = _WORD_RE.findall(phrase)
+        if words:
+            phrases.append(" ".join(words))
+    return list(dict.fromkeys(phrases))
+
+
+def normalize_place(value: Optional[str]) -> str:
+    return " ".join((value or "").lower().split())
+
+
+class CandidateFeatures(NamedTuple):
+    user_id: int
+    skills: Optional[str]
+    experience_years: Optional[int]
+    preferred_country: Optional[str]
+    preferred_city: Optional[str]
+
+
+class Vacancy(NamedTuple):
+    skills: Sequence[str]
+    min_experience_years: Optional[float] = None
+    country: Optional[str] = None
+    city: Optional[str] = None
+
+
+class Vocabulary:
+    """token <-> dense id; id 0 is reserved for "unknown/none" """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.tokens: List[str] = [""]
+
+    def add(self, token: str) -> int:
+        token_id = self.ids.get(token)
+        if token_id is None:
+            token_id = self.ids[token] = len(self.tokens)
+            self.tokens.append(token)
+        return token_id
+
+    def get(self, token: str) -> int:
+        return self.ids.get(token, 0)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+
+class CandidateMatrix:
+    """Row-per-candidate feature arrays with O(1) upsert/remove and capacity doubling"""
+
+    def __init__(self, skill_columns: int = 24, capacity: int = 1024, weights: Optional[dict] = None):
+        self.skill_columns = skill_columns
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.skill_vocab = Vocabulary()
+        self.place_vocab = Vocabulary()
+        self.row_of: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+        # Widest skill row in use; scoring only gathers these columns
+        self._width = 1
+        self._lock = threading.RLock()
+        self._allocate(capacity)
+
+    # ---- storage -------------------------------------------------------------
+
+    def _allocate(self, capacity: int) -> None:
+        # Padding points at vocabulary id 0, which a vacancy lookup never selects
+        self.skills = np.zeros((capacity, self.skill_columns), dtype=np.int32)
+        self.skill_counts = np.zeros(capacity, dtype=np.int16)
+        self.experience = np.zeros(capacity, dtype=np.float32)
+        self.country = np.zeros(capacity, dtype=np.int32)
+        self.city = np.zeros(capacity, dtype=np.int32)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.user_ids = np.zeros(capacity, dtype=np.int64)
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self.active)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for name in ("skills", "skill_counts", "experience", "country", "city", "active", "user_ids"):
+            old = getattr(self, name)
+            new = np.zeros((new_capacity, *old.shape[1:]), dtype=old.dtype)
+            new[:capacity] = old
+            setattr(self, name, new)
+
+    def _widen(self, needed: int) -> None:
+        """Make room for `needed` skill phrases in a row; nothing is ever cut off"""
+        columns = self.skills.shape[1]
+        if needed <= columns:
+            return
+        self.skill_columns = max(needed, columns * 2)
+        skills = np.zeros((len(self.skills), self.skill_columns), dtype=np.int32)
+        skills[:, :columns] = self.skills
+        self.skills = skills
+
+    def _encode(self, candidate: CandidateFeatures) -> Tuple[np.ndarray, int, float, int, int]:
+        phrases = tokenize_skills(candidate.skills)
+        ids = np.array([self.skill_vocab.add(phrase) for phrase in phrases], dtype=np.int32)
+        country = normalize_place(candidate.preferred_country)
+        city = normalize_place(candidate.preferred_city)
+        return (
+            ids,
+            len(ids),
+            float(candidate.experience_years or 0),
+            self.place_vocab.add(country) if country else 0,
+            self.place_vocab.add(city) if city else 0,
+        )
+
+    def upsert(self, candidate: CandidateFeatures) -> None:
+        encoded = self._encode(candidate)
+        with self._lock:
+            row = self.row_of.get(candidate.user_id)
+            if row is None:
+                if self._free:
+                    row = self._free.pop()
+                else:
+                    self._grow(self._size + 1)
+                    row = self._size
+                    self._size += 1
+                self.row_of[candidate.user_id] = row
+            ids, count, self.experience[row], self.country[row], self.city[row] = encoded
+            self._widen(count)
+            self.skills[row] = 0
+            self.skills[row, :count] = ids
+            self.skill_counts[row] = count
+            self.user_ids[row] = candidate.user_id
+            self.active[row] = True
+            self._width = max(self._width, count)
+
+    def load(self, candidates: Iterable[CandidateFeatures]) -> None:
+        for candidate in candidates:
+            self.upsert(candidate)
+
+    def remove(self, user_id: int) -> None:
+        with self._lock:
+            row = self.row_of.pop(user_id, None)
+            if row is not None:
+                self.active[row] = False
+                self.skills[row] = 0
+                self._free.append(row)
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    # ---- scoring -------------------------------------------------------------
+
+    def score(self, vacancy: Vacancy) -> np.ndarray:
+        """Score in [0, 1] for every row (-inf for empty slots and candidates with none of the skills)"""
+        n = self._size
+        weights = self.weights
+        # Vacancy skills are phrases; coverage counts how many of them a candidate has
+        required = list(dict.fromkeys(
+            tokenize_skills(skill)[0] for skill in vacancy.skills if tokenize_skills(skill)
+        ))
+
+        if required:
+            lookup = np.zeros(len(self.skill_vocab), dtype=bool)
+            lookup[[self.skill_vocab.get(token) for token in required]] = True
+            lookup[0] = False
+            matched = np.take(lookup, self.skills[:n, : self._width]).sum(axis=1, dtype=np.float32)
+            skill_score = matched / len(required)
+            # Experience and location alone must not rank someone with none of the skills
+            unmatched = matched == 0
+        else:
+            skill_score = np.ones(n, dtype=np.float32)
+            unmatched = np.zeros(n, dtype=bool)
+
+        if vacancy.min_experience_years:
+            experience_score = np.minimum(self.experience[:n] / np.float32(vacancy.min_experience_years), 1)
+        else:
+            experience_score = np.ones(n, dtype=np.float32)
+
+        location_score = np.zeros(n, dtype=np.float32)
+        country = self.place_vocab.get(normalize_place(vacancy.country)) if vacancy.country else None
+        city = self.place_vocab.get(normalize_place(vacancy.city)) if vacancy.city else None
+        if country is None and city is None:
+            location_score += 1
+        else:
+            if country:
+                location_score += np.where(self.country[:n] == country, 0.7, 0)
+            if city:
+                location_score += np.where(self.city[:n] == city, 0.3, 0)
+            # A candidate with no preference is open to anywhere
+            location_score = np.where(self.country[:n] == 0, 0.5, location_score)
+
+        scores = (
+            weights["skills"] * skill_score
+            + weights["experience"] * experience_score
+            + weights["location"] * location_score
+        ).astype(np.float32)
+        scores[~self.active[:n] | unmatched] = -np.inf
+        return scores
+
+    def top_k(self, vacancy: Vacancy, k: int = 20, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """[(user_id, score)] best first; argpartition keeps this O(n) rather than a full sort"""
+        with self._lock:
+            scores = self.score(vacancy)
+            if not len(scores):
+                return []
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [
+                (int(self.user_ids[row]), float(scores[row]))
+                for row in top
+                if scores[row] > min_score
+            ]
+
+    def matched_skills(self, user_id: int, vacancy: Vacancy) -> List[str]:
+        """Which of the vacancy's skills a candidate has (for explaining a handful of results)"""
+        with self._lock:
+            row = self.row_of.get(user_id)
+            if row is None:
+                return []
+            have = set(self.skills[row, : self.skill_counts[row]].tolist())
+        return [skill for skill in vacancy.skills
+                if tokenize_skills(skill) and self.skill_vocab.get(tokenize_skills(skill)[0]) in have]
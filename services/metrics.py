@@ -0,0 +1,299 @@
+"""In-process metrics rendered in the Prometheus text format, plus request and SQL instrumentation.
+
+Values are per process: with several uvicorn workers each one keeps its own
+registry, so scrape every worker (or run one worker per container).
+"""
+import bisect
+import logging
+import threading
+import time
+from collections import Counter as _Counter
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, *labels: str, value: float) -> None:
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][bisect.bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(labels, (list(e[0]), e[1], e[2])) for labels, e in self._values.items()]
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % (bound if bound == "+Inf" else _number(bound))
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {count}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collect) -> None:
+        """Callable run before each render, for gauges read on demand (pool state etc.)"""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            try:
+                collect()
+            except Exception:
+                logger.exception("Metrics collector failed")
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")))
+LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Time to response start", ("method", "route")))
+REQUEST_SIZE = REGISTRY.register(Histogram(
+    "http_request_size_bytes", "Request body size", ("method", "route"), SIZE_BUCKETS))
+RESPONSE_SIZE = REGISTRY.register(Histogram(
+    "http_response_size_bytes", "Response body size", ("method", "route"), SIZE_BUCKETS))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "Requests currently being handled"))
+DB_QUERIES = REGISTRY.register(Histogram(
+    "db_queries_per_request", "SQL statements executed per request", ("route",), COUNT_BUCKETS))
+DB_TIME = REGISTRY.register(Histogram(
+    "db_time_per_request_seconds", "Time spent in SQL statements per request", ("route",)))
+DB_STATEMENTS = REGISTRY.register(Counter(
+    "db_statements_total", "SQL statements executed (in and outside requests)"))
+REPEATED_QUERIES = REGISTRY.register(Counter(
+    "db_repeated_queries_total", "Requests that ran an identical SELECT repeatedly (likely N+1)", ("route",)))
+POOL_WAIT = REGISTRY.register(Histogram(
+    "db_pool_checkout_seconds", "Time to get a connection from the pool (queueing plus connect)", ("pool",),
+    WAIT_BUCKETS))
+POOL_TIMEOUTS = REGISTRY.register(Counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT", ("pool",)))
+POOL_STATE = REGISTRY.register(Gauge(
+    "db_pool_connections", "Pool connections by state; limit = pool_size + max_overflow", ("pool", "state")))
+
+
+# ---- per-request SQL accounting -------------------------------------------
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = _Counter()
+
+
+# Shared by reference with the threadpool/greenlet contexts that run the handler
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    DB_STATEMENTS.inc()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+        if statement.lstrip()[:6].upper() == "SELECT":
+            stats.statements[statement] += 1
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None and context.connection.info.get("query_start"):
+        context.connection.info["query_start"].pop()
+
+
+def instrument_engine(sync_engine) -> None:
+    """Count statements and DB time on an Engine (pass async_engine.sync_engine for asyncpg)"""
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def instrument_pool(engine, label: str) -> None:
+    """Report pool occupancy on every scrape (QueuePool only; NullPool has nothing to report)"""
+
+    def collect():
+        pool = engine.pool  # re-read: dispose() swaps in a new pool
+        if not hasattr(pool, "checkedout"):
+            return
+        POOL_STATE.set(label, "checked_out", value=pool.checkedout())
+        POOL_STATE.set(label, "idle", value=pool.checkedin())
+        POOL_STATE.set(label, "overflow", value=max(pool.overflow(), 0))
+        POOL_STATE.set(label, "limit", value=pool.size() + max(pool._max_overflow, 0))
+
+    REGISTRY.add_collector(collect)
+
+
+# ---- ASGI middleware -------------------------------------------------------
+
+def _route_label(app, scope) -> str:
+    """Route template rather than raw path, so label cardinality stays bounded"""
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unknown")
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Records latency, sizes, in-flight count and SQL stats; adds a Server-Timing header"""
+
+    def __init__(self, app, router):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        method = scope["method"]
+        route = _route_label(self.router, scope)
+        state = {"status": 500, "response_bytes": 0}
+        request_bytes = 0
+        for name, value in scope.get("headers", ()):
+            if name == b"content-length":
+                # A malformed header is the app's to reject, not a reason for a 500 here
+                try:
+                    request_bytes = max(int(value or 0), 0)
+                except ValueError:
+                    request_bytes = 0
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                elapsed = time.perf_counter() - start
+                LATENCY.observe(method, route, value=elapsed)
+                timing = (
+                    f'app;dur={elapsed * 1000:.1f}, '
+                    f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"'
+                )
+                message.setdefault("headers", []).append((b"server-timing", timing.encode()))
+            elif message["type"] == "http.response.body":
+                state["response_bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            _request_stats.reset(token)
+            REQUESTS.inc(method, route, str(state["status"]))
+            REQUEST_SIZE.observe(method, route, value=request_bytes)
+            RESPONSE_SIZE.observe(method, route, value=state["response_bytes"])
+            DB_QUERIES.observe(route, value=stats.queries)
+            DB_TIME.observe(route, value=stats.db_time)
+            repeated = {sql: n for sql, n in stats.statements.items()
+                        if n >= settings.METRICS_REPEATED_QUERY_THRESHOLD}
+            if repeated:
+                REPEATED_QUERIES.inc(route)
+                for sql, n in repeated.items():
+                    logger.warning("%s %s ran the same SELECT %d times (N+1?): %s",
+                                   method, route, n, " ".join(sql.split())[:300])
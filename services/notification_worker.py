@@ -0,0 +1,180 @@
+"""Sends booking decision notifications and reminders driven by the Booking flags.
+
+Each batch is claimed with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+workers (and the optional in-process loop) can run side by side. The claim
+only leases the rows (notification_retry_at = now + NOTIFICATION_LEASE_SECONDS)
+and commits, so no row lock is held while mail is sent; results are written
+in a second short transaction. Delivery is at-least-once: a crash between
+sending and recording resends that message once the lease runs out.
+
+Run standalone with:
+    python -m services.notification_worker [--once]
+"""
+import argparse
+import asyncio
+import logging
+import random
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+from database import SessionLocal
+from models import Booking
+from services.notifications import build_notification, get_sender
+
+logger = logging.getLogger(__name__)
+
+DECISION_STATUSES = ("confirmed", "rejected")
+
+
+def _retry_due():
+    return or_(Booking.notification_retry_at.is_(None), Booking.notification_retry_at <= func.now())
+
+
+def due_conditions(kind: str) -> list:
+    conditions = [_retry_due(), Booking.notification_attempts < settings.NOTIFICATION_MAX_ATTEMPTS]
+    if kind == "decision":
+        return conditions + [
+            Booking.notification_sent.isnot(True),
+            Booking.status.in_(DECISION_STATUSES),
+        ]
+    today = date.today()
+    return conditions + [
+        Booking.status == "confirmed",
+        Booking.notification_sent == True,
+        Booking.reminder_sent.isnot(True),
+        Booking.date >= today,
+        Booking.date <= today + timedelta(days=settings.REMINDER_LEAD_DAYS),
+    ]
+
+
+def claim_batch(db: Session, kind: str, limit: int, lease_until: datetime):
+    """Lease up to `limit` due bookings no other worker holds; returns (booking_id, attempts, message)"""
+    bookings = db.execute(
+        select(Booking)
+        .where(*due_conditions(kind))
+        .order_by(Booking.notification_retry_at.nullsfirst(), Booking.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    claimed = []
+    for booking in bookings:
+        booking.notification_retry_at = lease_until
+        claimed.append((booking.id, booking.notification_attempts or 0, build_notification(booking, kind)))
+    db.commit()
+    return claimed
+
+
+def record_result(db: Session, booking_id: int, lease_until: datetime, values: dict) -> None:
+    """Write a send result, unless the booking was re-queued (e.g. re-decided) since it was leased"""
+    db.execute(
+        update(Booking)
+        .where(Booking.id == booking_id, Booking.notification_retry_at == lease_until)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff, jittered between half and the full delay"""
+    ceiling = min(settings.NOTIFICATION_BACKOFF_MAX_SECONDS,
+                  settings.NOTIFICATION_BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+def process_batch(sender, kind: str, limit: Optional[int] = None) -> int:
+    """Lease, send and record one batch; returns how many bookings were claimed"""
+    lease = settings.NOTIFICATION_LEASE_SECONDS
+    db = SessionLocal()
+    try:
+        lease_until = datetime.now(timezone.utc) + timedelta(seconds=lease)
+        claimed = claim_batch(db, kind, limit or settings.NOTIFICATION_BATCH_SIZE, lease_until)
+
+        results = []
+        for booking_id, attempts, message in claimed:
+            # Leave the rest for when the lease runs out rather than racing another worker
+            if datetime.now(timezone.utc) >= lease_until - timedelta(seconds=lease / 10):
+                break
+            try:
+                sender.send(message)
+            except Exception as exc:
+                attempts += 1
+                results.append((booking_id, {
+                    "notification_attempts": attempts,
+                    "notification_retry_at": datetime.now(timezone.utc) + timedelta(seconds=backoff_seconds(attempts)),
+                    "notification_error": f"{type(exc).__name__}: {exc}"[:1000],
+                }))
+                logger.warning("Booking %s %s notification failed (attempt %s): %s",
+                               booking_id, kind, attempts, exc)
+                continue
+            values = {"notification_attempts": 0, "notification_retry_at": None, "notification_error": None}
+            if kind == "decision":
+                values.update(notification_sent=True, notification_date=datetime.now(timezone.utc))
+            else:
+                values["reminder_sent"] = True
+            results.append((booking_id, values))
+
+        for booking_id, values in results:
+            record_result(db, booking_id, lease_until, values)
+        db.commit()
+        return len(claimed)
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def run_once(sender=None) -> int:
+    """Drain everything currently due; returns the number of bookings processed"""
+    sender = sender or get_sender()
+    total = 0
+    for kind in ("decision", "reminder"):
+        while True:
+            claimed = process_batch(sender, kind)
+            total += claimed
+            if claimed < settings.NOTIFICATION_BATCH_SIZE:
+                break
+    return total
+
+
+def run_forever(stop: Optional[threading.Event] = None, sender=None) -> None:
+    stop = stop or threading.Event()
+    sender = sender or get_sender()
+    while not stop.is_set():
+        try:
+            run_once(sender)
+        except Exception:
+            logger.exception("Notification worker pass failed")
+        stop.wait(settings.NOTIFICATION_POLL_SECONDS)
+
+
+async def notification_loop() -> None:
+    """In-process variant for single-instance deployments (NOTIFICATION_WORKER_IN_PROCESS)"""
+    sender = get_sender()
+    while True:
+        try:
+            await run_in_threadpool(run_once, sender)
+        except Exception:
+            logger.exception("Notification worker pass failed")
+        await asyncio.sleep(settings.NOTIFICATION_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="process what is due now and exit")
+    parser.add_argument("--sender", choices=["file", "smtp"], default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.once:
+        print(f"Processed {run_once(get_sender(args.sender))} bookings")
+    else:
+        try:
+            run_forever(sender=get_sender(args.sender))
+        except KeyboardInterrupt:
+            pass
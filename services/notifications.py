@@ -0,0 +1,86 @@
+import json
+import os
+import smtplib
+import threading
+from datetime import datetime, timezone
+from email.message import EmailMessage
+from typing import NamedTuple
+
+from config import settings
+from models import Booking
+
+
+class Notification(NamedTuple):
+    to: str
+    subject: str
+    body: str
+    booking_id: int
+    kind: str  # "decision" or "reminder"
+
+
+def build_notification(booking: Booking, kind: str) -> Notification:
+    when = f"{booking.date:%d %B %Y} at {booking.time}"
+    if kind == "reminder":
+        subject = "Reminder: your appointment"
+        body = f"Hello {booking.name},\n\nThis is a reminder of your appointment on {when}.\n"
+    elif booking.status == "confirmed":
+        subject = "Your appointment is confirmed"
+        body = f"Hello {booking.name},\n\nYour appointment on {when} has been confirmed.\n"
+    else:
+        subject = "Your appointment request"
+        body = f"Hello {booking.name},\n\nUnfortunately we cannot accept your appointment on {when}.\n"
+    if kind == "decision" and booking.admin_response:
+        body += f"\n{booking.admin_response}\n"
+    return Notification(booking.email, subject, body, booking.id, kind)
+
+
+class FileSender:
+    """Appends each message to an NDJSON outbox; for development and tests"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, message: Notification) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        record = {**message._asdict(), "sent_at": datetime.now(timezone.utc).isoformat()}
+        with self._lock, open(self.path, "a", encoding="utf-8") as out:
+            out.write(json.dumps(record) + "\n")
+
+
+class SmtpSender:
+    """One SMTP connection per message; the worker's batches are small"""
+
+    def __init__(self, host: str, port: int, username: str = "", password: str = "",
+                 starttls: bool = False, sender: str = "no-reply@localhost"):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.sender = sender
+
+    def send(self, message: Notification) -> None:
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = message.to
+        email["Subject"] = message.subject
+        email.set_content(message.body)
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(email)
+
+
+def get_sender(name: str = None):
+    name = name or settings.NOTIFICATION_SENDER
+    if name == "file":
+        return FileSender(settings.NOTIFICATION_OUTBOX_PATH)
+    if name == "smtp":
+        return SmtpSender(
+            settings.SMTP_HOST, settings.SMTP_PORT, settings.SMTP_USERNAME, settings.SMTP_PASSWORD,
+            settings.SMTP_STARTTLS, settings.SMTP_FROM
+        )
+    raise ValueError(f"Unknown notification sender: {name}")
@@ -0,0 +1,72 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+# Header carrying the cursor for the next page; list bodies stay plain JSON arrays
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != 2:
+            raise ValueError(cursor)
+        return values
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """Validate a comma separated `fields=` projection against the response schema"""
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(requested) - set(allowed))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+
+def keyset_page(
+    db: Session,
+    model,
+    fields: List[str],
+    conditions: list,
+    sort_col,
+    cursor: Optional[str],
+    limit: int,
+    parse_sort: Callable,
+) -> Tuple[List[dict], Optional[str]]:
+    """One page ordered by (sort_col, id) descending, resuming after `cursor`"""
+    id_col = model.id
+    names = list(dict.fromkeys([*fields, sort_col.key, id_col.key]))
+    stmt = select(*[getattr(model, name) for name in names]).where(*conditions)
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        # A crafted id would otherwise reach Postgres and fail there as a 500
+        if not isinstance(last_id, int) or isinstance(last_id, bool):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        try:
+            sort_value = parse_sort(sort_value)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(tuple_(sort_col, id_col) < tuple_(sort_value, last_id))
+
+    rows = db.execute(stmt.order_by(sort_col.desc(), id_col.desc()).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor([last[sort_col.key], last[id_col.key]])
+    return [{name: row._mapping[name] for name in fields} for row in rows], next_cursor
@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models import User
+from services.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Immutable slice of a User row, enough for auth checks and UserResponse"""
+    id: int
+    username: Optional[str]
+    email: str
+    full_name: Optional[str]
+    phone: Optional[str]
+    license_active: bool
+    license_type: Optional[str]
+    current_step: Optional[int]
+    registration_status: Optional[str]
+    created_at: datetime
+    user_folder: Optional[str]
+
+
+_COLUMNS = [getattr(User, name) for name in Principal.__dataclass_fields__]
+
+# Keyed by token subject (email). Invalidation is per worker, so the TTL bounds
+# how long another worker may keep serving a stale snapshot.
+_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_MAXSIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+async def load_principal(db: AsyncSession, email: str) -> Optional[Principal]:
+    principal = _cache.get(email)
+    if principal is None:
+        row = (await db.execute(select(*_COLUMNS).where(User.email == email))).first()
+        if row is None:
+            return None
+        principal = Principal(**row._mapping)
+        _cache.set(email, principal)
+    return principal
+
+
+def invalidate_principal(email: Optional[str]) -> None:
+    if email:
+        _cache.invalidate(email)
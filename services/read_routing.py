@@ -0,0 +1,34 @@
+import time
+
+from config import settings
+from database import PRIMARY_STICKY_COOKIE
+
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class PrimaryStickinessMiddleware:
+    """After a successful write, pin the client's get_read_db reads to the primary.
+
+    The cookie carries an expiry timestamp, so any worker can honour it
+    without shared state.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in _SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + settings.REPLICA_STICKY_SECONDS
+                cookie = (
+                    f"{PRIMARY_STICKY_COOKIE}={until:.3f}; Max-Age={settings.REPLICA_STICKY_SECONDS}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message.setdefault("headers", []).append((b"set-cookie", cookie.encode()))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,57 @@
+"""Fast JSON path for read-only list endpoints.
+
+The default FastAPI path loads an ORM object per row, validates it through
+the response_model (from_attributes) and JSON-encodes the result. List routes
+whose columns already match the schema instead select just those columns and
+hand the tuples to orjson; the response_model stays on the route for the
+OpenAPI docs, but returning a Response skips its validation.
+"""
+from decimal import Decimal
+from typing import Callable, Iterable, List, Optional, Sequence
+
+import orjson
+from starlette.responses import Response
+
+# OPT_UTC_Z: aware UTC datetimes end in "Z", as pydantic renders them
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def schema_columns(model, schema) -> list:
+    """The model columns behind a response schema, in field order"""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def rows_to_dicts(
+    rows: Iterable[Sequence],
+    fields: List[str],
+    extra: Optional[Callable[[dict], dict]] = None,
+) -> List[dict]:
+    """Column tuples -> JSON-ready dicts; `extra` adds computed keys per item"""
+    items = [dict(zip(fields, row)) for row in rows]
+    if extra is not None:
+        for item in items:
+            item.update(extra(item))
+    return items
+
+
+def rows_response(rows: Iterable[Sequence], fields: List[str], extra=None, headers=None) -> FastJSONResponse:
+    return FastJSONResponse(rows_to_dicts(rows, fields, extra), headers=headers)
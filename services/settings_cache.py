@@ -0,0 +1,135 @@
+import logging
+import select
+import threading
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal, engine
+from models import Settings
+from services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "settings_changed"
+
+DEFAULT_SETTINGS = {
+    "homepage_content": {
+        "hero_title": "Your Gateway to European Employment",
+        "hero_subtitle": "Connecting talented professionals with opportunities across EU",
+        "about_text": "We specialize in placing skilled workers in positions throughout Europe.",
+        "countries": ["Germany", "France", "Netherlands", "Belgium", "Austria"]
+    },
+    "time_slots": {"slots": ["09:00", "10:00", "11:00", "14:00", "15:00", "16:00"]},
+}
+
+_cache = TTLCache(maxsize=settings.SETTINGS_CACHE_MAXSIZE, ttl=settings.SETTINGS_CACHE_TTL_SECONDS)
+
+
+def _snapshot(row: Settings) -> dict:
+    """Plain-dict copy of a Settings row, shaped like the ORM response it replaces"""
+    return {"id": row.id, "key": row.key, "value": row.value, "description": row.description}
+
+
+def seed_default_settings(db: Optional[Session] = None) -> None:
+    """Insert any missing default rows; safe to run from several workers at once"""
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        for key, value in DEFAULT_SETTINGS.items():
+            db.execute(
+                insert(Settings).values(key=key, value=value).on_conflict_do_nothing(index_elements=["key"])
+            )
+        db.commit()
+    finally:
+        if own_session:
+            db.close()
+
+
+def _load(key: str) -> Optional[dict]:
+    """Read-only: rows are seeded at startup, a missing default is served from memory"""
+    db = SessionLocal()
+    try:
+        row = db.query(Settings).filter(Settings.key == key).first()
+        if row is not None:
+            return _snapshot(row)
+    finally:
+        db.close()
+    if key in DEFAULT_SETTINGS:
+        return {"id": None, "key": key, "value": DEFAULT_SETTINGS[key], "description": None}
+    return None
+
+
+def get_setting(key: str) -> Optional[dict]:
+    """Cached read of a settings row by key"""
+    return _cache.get_or_load(key, lambda: _load(key))
+
+
+def notify_setting_changed(db: Session, key: str) -> None:
+    """Queue a cross-worker invalidation; Postgres delivers it only if the transaction commits"""
+    if settings.SETTINGS_CACHE_NOTIFY:
+        db.execute(text("SELECT pg_notify(:channel, :key)"), {"channel": NOTIFY_CHANNEL, "key": key})
+
+
+def store_setting(row: Settings) -> None:
+    """Write-through after a committed update"""
+    _cache.set(row.key, _snapshot(row))
+
+
+def invalidate_setting(key: str) -> None:
+    _cache.invalidate(key)
+
+
+class SettingsListener(threading.Thread):
+    """Drops cache entries when another worker NOTIFYs a settings change"""
+
+    def __init__(self):
+        super().__init__(name="settings-listener", daemon=True)
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            conn = None
+            try:
+                # Dedicated connection outside the pool, it sits in LISTEN forever
+                cargs, cparams = engine.dialect.create_connect_args(engine.url)
+                conn = engine.dialect.connect(*cargs, **cparams)
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+                # Anything could have changed while we were not listening
+                _cache.clear()
+                while not self._stop_event.is_set():
+                    if select.select([conn], [], [], 5.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        _cache.invalidate(conn.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("Settings listener failed, reconnecting")
+                self._stop_event.wait(5.0)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+_listener: Optional[SettingsListener] = None
+
+
+def start_settings_listener() -> None:
+    global _listener
+    if _listener is None:
+        _listener = SettingsListener()
+        _listener.start()
+
+
+def stop_settings_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
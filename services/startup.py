@@ -0,0 +1,147 @@
+"""Worker boot steps run from the FastAPI lifespan (never at import time).
+
+Order: wait for Postgres, optionally migrate, pre-fill the pools, seed and
+prime the hot caches. Each step logs its duration so slow boots are easy to
+attribute.
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import exc, func, select, text
+
+from config import settings
+from database import SessionLocal, async_engine, engine, replica_engine
+from services.dashboard_stats import refresh_materialized
+from services.gallery_images import gallery_listing
+from services.settings_cache import DEFAULT_SETTINGS, get_setting, seed_default_settings, start_settings_listener
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Serializes RUN_MIGRATIONS_ON_STARTUP across workers booting at once
+MIGRATION_LOCK_KEY = 0x6167656E6379  # "agency"
+
+STATIC_DIRS = ("static/cv", "static/gallery")
+
+
+@contextmanager
+def timed(step: str):
+    started = time.perf_counter()
+    yield
+    logger.info("startup: %s took %.0f ms", step, (time.perf_counter() - started) * 1000)
+
+
+def ensure_directories() -> None:
+    for path in (*STATIC_DIRS, settings.USER_DATA_PATH):
+        os.makedirs(path, exist_ok=True)
+
+
+def wait_for_database() -> None:
+    """Retry the first connection with backoff, so a brief outage delays boot instead of killing it"""
+    deadline = time.monotonic() + settings.STARTUP_DB_TIMEOUT_SECONDS
+    delay = 0.25
+    while True:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return
+        except exc.OperationalError as error:
+            if time.monotonic() + delay > deadline:
+                raise
+            logger.warning("startup: database not reachable (%s), retrying in %.1fs", error.orig, delay)
+            time.sleep(delay)
+            delay = min(delay * 2, 5.0)
+
+
+def run_migrations() -> None:
+    """alembic upgrade head, one worker at a time (the rest find nothing to do)"""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    # Autocommit: an idle open transaction here would stall CREATE INDEX CONCURRENTLY
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(select(func.pg_advisory_lock(MIGRATION_LOCK_KEY)))
+        try:
+            command.upgrade(config, "head")
+        finally:
+            conn.execute(select(func.pg_advisory_unlock(MIGRATION_LOCK_KEY)))
+
+
+def prefill_pool(target_engine, count: int) -> None:
+    """Open `count` connections up front so the first requests skip the TCP/auth handshake.
+
+    They are held together, otherwise the pool would hand back the same one each time.
+    """
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(target_engine.connect())
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+async def prefill_async_pool(count: int) -> None:
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(await async_engine.connect())
+    finally:
+        for conn in connections:
+            await conn.close()
+
+
+def prefill_count() -> int:
+    if settings.DB_PGBOUNCER_MODE:
+        return 0  # NullPool: nothing to keep warm
+    return min(settings.DB_POOL_PREFILL, settings.DB_POOL_SIZE)
+
+
+def prime_caches() -> None:
+    """Load what the public homepage reads, so the first visitors hit warm caches"""
+    for key in DEFAULT_SETTINGS:
+        get_setting(key)
+    gallery_listing()
+
+
+def sync_startup() -> None:
+    """Blocking boot steps; the lifespan runs these in a worker thread"""
+    with timed("directories"):
+        ensure_directories()
+    with timed("database reachable"):
+        wait_for_database()
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        with timed("migrations"):
+            run_migrations()
+    count = prefill_count()
+    if count:
+        with timed(f"pool pre-fill ({count})"):
+            prefill_pool(engine, count)
+            if replica_engine is not None:
+                prefill_pool(replica_engine, count)
+    # Seed default settings rows here so public reads never insert
+    with timed("settings seed"):
+        seed_default_settings()
+    if settings.SETTINGS_CACHE_NOTIFY:
+        start_settings_listener()
+    if settings.DASHBOARD_STATS_MATERIALIZED:
+        # Recount once per boot so counters never drift across deploys
+        with timed("dashboard stats refresh"):
+            db = SessionLocal()
+            try:
+                refresh_materialized(db)
+            finally:
+                db.close()
+    with timed("cache priming"):
+        prime_caches()
+
+
+async def dispose_engines() -> None:
+    engine.dispose()
+    if replica_engine is not None:
+        replica_engine.dispose()
+    await async_engine.dispose()
@@ -0,0 +1,257 @@
+import hashlib
+import itertools
+import os
+import uuid
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from fastapi import UploadFile
+from sqlalchemy import LargeBinary, func, insert, delete, select
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+from database import SessionLocal
+from models import DocumentChunk, UserDocument
+from services.compression import CODECS, NONE, choose_codec, compress_stream, decompress_stream, preferred_codec
+
+# file_path values starting with this prefix live in the document_chunks table
+DB_PREFIX = "db:"
+
+
+class StoredObject(NamedTuple):
+    path: str
+    size: int  # original bytes
+    sha256: str  # of the original bytes
+    compression: Optional[str] = None
+    stored_size: Optional[int] = None  # bytes actually stored, when compressed
+
+
+def iter_file_chunks(fileobj, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+    """Read a file object in fixed-size chunks"""
+    chunk_size = chunk_size or settings.DOCUMENT_CHUNK_SIZE
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def rechunk(chunks: Iterable[bytes], chunk_size: int) -> Iterator[bytes]:
+    """Regroup a byte stream into chunks of exactly chunk_size (last one may be short)"""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+def slice_stream(chunks: Iterable[bytes], skip: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+    """Drop the first `skip` bytes of a chunk stream and stop after `length` bytes"""
+    for chunk in chunks:
+        if skip:
+            if skip >= len(chunk):
+                skip -= len(chunk)
+                continue
+            chunk = chunk[skip:]
+            skip = 0
+        if length is not None:
+            if length <= 0:
+                return
+            chunk = chunk[:length]
+            length -= len(chunk)
+        yield chunk
+
+
+class FilesystemStorage:
+    """Stores each document as a file in the owner's user folder"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def write(self, chunks: Iterable[bytes], folder: Optional[str] = None) -> StoredObject:
+        target_dir = Path(folder or self.root) / "documents"
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / uuid.uuid4().hex
+        partial = target.with_suffix(".part")
+        size = 0
+        digest = hashlib.sha256()
+        try:
+            with open(partial, "wb") as out:
+                for chunk in chunks:
+                    out.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            os.replace(partial, target)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        return StoredObject(str(target), size, digest.hexdigest())
+
+    def iter_chunks(self, path: str, start: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+        with open(path, "rb") as f:
+            f.seek(start)
+            yield from slice_stream(iter_file_chunks(f), length=length)
+
+    def delete(self, path: str) -> None:
+        Path(path).unlink(missing_ok=True)
+
+
+class DatabaseStorage:
+    """Stores each document as fixed-size rows in document_chunks"""
+
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+
+    def write(self, chunks: Iterable[bytes], folder: Optional[str] = None) -> StoredObject:
+        key = uuid.uuid4().hex
+        size = 0
+        digest = hashlib.sha256()
+        db = SessionLocal()
+        try:
+            for seq, chunk in enumerate(rechunk(chunks, self.chunk_size)):
+                db.execute(insert(DocumentChunk).values(storage_key=key, seq=seq, data=chunk))
+                digest.update(chunk)
+                size += len(chunk)
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return StoredObject(DB_PREFIX + key, size, digest.hexdigest())
+
+    def iter_chunks(self, path: str, start: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+        key = path[len(DB_PREFIX):]
+        db = SessionLocal()
+        try:
+            # Find the chunk holding `start` from the chunk lengths alone
+            first_seq, skip = 0, start
+            if start:
+                sizes = db.execute(
+                    select(DocumentChunk.seq, func.octet_length(DocumentChunk.data))
+                    .where(DocumentChunk.storage_key == key)
+                    .order_by(DocumentChunk.seq)
+                ).all()
+                for seq, chunk_len in sizes:
+                    first_seq = seq
+                    if skip < chunk_len:
+                        break
+                    skip -= chunk_len
+
+            # Server-side cursor: one chunk row in memory at a time
+            result = db.execute(
+                select(DocumentChunk.data)
+                .where(DocumentChunk.storage_key == key, DocumentChunk.seq >= first_seq)
+                .order_by(DocumentChunk.seq)
+                .execution_options(yield_per=1)
+            )
+            yield from slice_stream(result.scalars(), skip, length)
+        finally:
+            db.close()
+
+    def delete(self, path: str) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(delete(DocumentChunk).where(DocumentChunk.storage_key == path[len(DB_PREFIX):]))
+            db.commit()
+        finally:
+            db.close()
+
+
+_backends = {}
+
+
+def get_storage(backend: Optional[str] = None):
+    """Return the storage backend used for new writes"""
+    backend = backend or settings.DOCUMENT_STORAGE_BACKEND
+    if backend not in _backends:
+        if backend == "filesystem":
+            _backends[backend] = FilesystemStorage(settings.USER_DATA_PATH)
+        elif backend == "database":
+            _backends[backend] = DatabaseStorage(settings.DOCUMENT_CHUNK_SIZE)
+        else:
+            raise ValueError(f"Unknown document storage backend: {backend}")
+    return _backends[backend]
+
+
+def storage_for_path(path: str):
+    """Return the backend that owns an existing file_path"""
+    return get_storage("database" if path.startswith(DB_PREFIX) else "filesystem")
+
+
+def iter_legacy_blob(document_id: int, start: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+    """Stream a pre-storage-layer UserDocument.file_data blob without loading it whole"""
+    chunk_size = settings.DOCUMENT_CHUNK_SIZE
+    db = SessionLocal()
+    try:
+        total = db.execute(
+            select(func.octet_length(UserDocument.file_data)).where(UserDocument.id == document_id)
+        ).scalar() or 0
+        end = total if length is None else min(total, start + length)
+        for offset in range(start, end, chunk_size):
+            yield db.execute(
+                select(func.substring(
+                    UserDocument.file_data, offset + 1, min(chunk_size, end - offset), type_=LargeBinary
+                )).where(UserDocument.id == document_id)
+            ).scalar()
+    finally:
+        db.close()
+
+
+def store_document(
+    chunks: Iterable[bytes],
+    folder: Optional[str] = None,
+    content_type: Optional[str] = None,
+    filename: Optional[str] = None,
+    storage=None,
+) -> StoredObject:
+    """Write a document, compressed when the type policy and a first-chunk probe allow it"""
+    storage = storage or get_storage()
+    chunks = iter(chunks)
+    first = next(chunks, b"")
+    original = itertools.chain([first], chunks)
+    codec = choose_codec(content_type, filename, first)
+    if codec is None:
+        stored = storage.write(original, folder)
+        # With compression switched off the row stays unchecked for a later backfill
+        return stored._replace(compression=NONE if preferred_codec() else None)
+
+    digest = hashlib.sha256()
+    size = 0
+
+    def counted():
+        nonlocal size
+        for chunk in original:
+            digest.update(chunk)
+            size += len(chunk)
+            yield chunk
+
+    stored = storage.write(compress_stream(counted(), codec), folder)
+    return StoredObject(stored.path, size, digest.hexdigest(), codec, stored.size)
+
+
+async def save_upload(upload: UploadFile, folder: Optional[str] = None) -> StoredObject:
+    """Copy an upload into document storage chunk by chunk"""
+    return await run_in_threadpool(
+        store_document, iter_file_chunks(upload.file), folder, upload.content_type, upload.filename
+    )
+
+
+def iter_document(document: UserDocument, start: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+    """Stream a document's bytes (optionally a byte range) from wherever they are stored"""
+    if document.file_path and document.compression in CODECS:
+        # A compressed stream cannot seek, so a range decompresses from the start and skips ahead
+        stored = storage_for_path(document.file_path).iter_chunks(document.file_path)
+        return slice_stream(decompress_stream(stored, document.compression), start, length)
+    if document.file_path:
+        return storage_for_path(document.file_path).iter_chunks(document.file_path, start, length)
+    return iter_legacy_blob(document.id, start, length)
+
+
+def delete_document_file(file_path: Optional[str]) -> None:
+    """Remove stored bytes once the owning UserDocument row is gone"""
+    if file_path:
+        storage_for_path(file_path).delete(file_path)
@@ -0,0 +1,101 @@
+import html
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import cast, func, literal, literal_column, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from sqlalchemy.orm import Session
+
+from models import User
+from services.pagination import decode_cursor, encode_cursor
+
+ENGLISH = literal_column("'english'::regconfig")
+SIMPLE = literal_column("'simple'::regconfig")
+# Control characters as ts_headline markers, so user text can be HTML-escaped safely
+_START, _STOP = "\x02", "\x03"
+HEADLINE_OPTIONS = f"StartSel={_START}, StopSel={_STOP}, MaxFragments=2, MaxWords=18, MinWords=6, FragmentDelimiter=\" … \""
+
+
+def _like_pattern(q: str) -> str:
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _snippet(raw: Optional[str]) -> Optional[str]:
+    if not raw or _START not in raw:
+        return None
+    return html.escape(raw).replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+def search_query(q: str, conditions: list = ()):
+    """(tsquery, SELECT id, rank of every matching user)"""
+    tsquery = func.websearch_to_tsquery(ENGLISH, q).op("||")(func.websearch_to_tsquery(SIMPLE, q))
+    # real -> double precision, so the rank in a cursor compares equal after the round trip
+    rank = cast(
+        func.ts_rank_cd(User.search_vector, tsquery)
+        + func.greatest(func.similarity(User.full_name, q), func.similarity(User.email, q)),
+        DOUBLE_PRECISION
+    ).label("rank")
+    return tsquery, select(User.id, rank).where(
+        or_(
+            User.search_vector.op("@@")(tsquery),
+            User.full_name.op("%")(q),
+            User.email.ilike(_like_pattern(q), escape="\\"),
+        ),
+        *conditions
+    )
+
+
+def search_users(
+    db: Session,
+    q: str,
+    fields: List[str],
+    conditions: list,
+    cursor: Optional[str],
+    limit: int,
+) -> Tuple[List[dict], Optional[str]]:
+    """Ranked candidate search; each item gets `rank` and an HTML `snippet` with <mark> highlights.
+
+    Matches the weighted search_vector (English stemming OR plain words) and
+    fuzzy full_name/email trigrams, ranked by ts_rank_cd plus name similarity.
+    Pages are keyset on (rank, id), like the other admin lists.
+    """
+    tsquery, matches = search_query(q, conditions)
+    matches = matches.subquery()
+    page = select(matches.c.id, matches.c.rank)
+    if cursor:
+        last_rank, last_id = decode_cursor(cursor)
+        if not isinstance(last_rank, (int, float)) or not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        page = page.where(
+            tuple_(matches.c.rank, matches.c.id) < tuple_(literal(float(last_rank), DOUBLE_PRECISION), last_id)
+        )
+    page = page.order_by(matches.c.rank.desc(), matches.c.id.desc()).limit(limit + 1).cte("page")
+
+    # Headlines are costly, so only the page's rows get one
+    document = (
+        func.coalesce(User.skills, "") + literal(" • ") + func.coalesce(User.previous_roles, "")
+    )
+    rows = db.execute(
+        select(
+            *[getattr(User, name) for name in fields],
+            page.c.id.label("page_id"),
+            page.c.rank,
+            func.ts_headline(ENGLISH, document, tsquery, HEADLINE_OPTIONS).label("snippet"),
+        )
+        .join(page, page.c.id == User.id)
+        .order_by(page.c.rank.desc(), User.id.desc())
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor([last["rank"], last["page_id"]])
+    items = []
+    for row in rows:
+        item = {name: row._mapping[name] for name in fields}
+        item["rank"] = round(row.rank, 4)
+        item["snippet"] = _snippet(row.snippet)
+        items.append(item)
+    return items, next_cursor
@@ -0,0 +1,32 @@
+from services.cache import TTLCache
+
+
+def test_get_or_load_caches_and_skips_none():
+    cache = TTLCache()
+    assert cache.get_or_load("a", lambda: 1) == 1
+    assert cache.get_or_load("a", lambda: 2) == 1
+    assert cache.get_or_load("b", lambda: None) is None
+    assert cache.get("b") is None
+
+
+def test_load_started_before_a_write_is_not_cached():
+    cache = TTLCache()
+
+    def stale_loader():
+        # A write-through lands while the old row is still being read
+        cache.set("key", "new")
+        return "old"
+
+    assert cache.get_or_load("key", stale_loader) == "old"
+    assert cache.get("key") == "new"
+
+
+def test_load_started_before_an_invalidation_is_not_cached():
+    cache = TTLCache()
+
+    def stale_loader():
+        cache.invalidate("key")
+        return "old"
+
+    cache.get_or_load("key", stale_loader)
+    assert cache.get("key") is None
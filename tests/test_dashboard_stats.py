@@ -0,0 +1,27 @@
+import threading
+
+from services import dashboard_stats
+
+
+def test_refresh_runs_off_the_caller_and_coalesces(monkeypatch):
+    started, release, calls = threading.Event(), threading.Event(), []
+
+    def slow_refresh(db):
+        calls.append(threading.current_thread().name)
+        started.set()
+        release.wait(5)
+
+    monkeypatch.setattr(dashboard_stats, "SessionLocal", lambda: type("DB", (), {"close": lambda self: None})())
+    monkeypatch.setattr(dashboard_stats, "refresh_materialized", slow_refresh)
+
+    dashboard_stats.schedule_refresh()
+    assert started.wait(5)
+    # Requests during a running refresh fold into a single rerun
+    dashboard_stats.schedule_refresh()
+    dashboard_stats.schedule_refresh()
+    release.set()
+    assert dashboard_stats._refresh_lock.acquire(timeout=5)
+    dashboard_stats._refresh_lock.release()
+
+    assert len(calls) == 2
+    assert threading.current_thread().name not in calls
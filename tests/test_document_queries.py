@@ -0,0 +1,32 @@
+"""Document listings and metadata reads must never select the file_data blob.
+
+Compiled against the Postgres dialect only; no database needed.
+"""
+from sqlalchemy.dialects import postgresql
+
+import main
+from services.export import DOCUMENT_EXPORT_FIELDS
+
+
+def compiled(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_document_list_select_skips_blob():
+    sql = compiled(main.document_list_select(1))
+    assert "user_documents.filename" in sql
+    assert "file_data" not in sql
+
+
+def test_document_metadata_select_skips_blob():
+    sql = compiled(main.document_metadata_select().where(main.UserDocument.id == 1))
+    assert "user_documents.file_path" in sql
+    assert "file_data" not in sql
+
+
+def test_document_list_fields_match_response_schema():
+    assert set(main.DOCUMENT_LIST_FIELDS) == set(main.DocumentOut.model_fields) - {"download_url"}
+
+
+def test_document_export_skips_blob():
+    assert "file_data" not in DOCUMENT_EXPORT_FIELDS
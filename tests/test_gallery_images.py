@@ -0,0 +1,34 @@
+import io
+import os
+
+from PIL import Image
+
+from services import gallery_images
+from services.gallery_images import publish, stage_upload
+
+
+def png_bytes() -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (4, 4), (200, 10, 10)).save(out, "PNG")
+    return out.getvalue()
+
+
+def test_same_bytes_share_one_address(tmp_path, monkeypatch):
+    monkeypatch.setattr(gallery_images, "GALLERY_DIR", str(tmp_path))
+    data = png_bytes()
+    paths = set()
+    for _ in range(3):
+        staged = stage_upload(io.BytesIO(data))
+        publish(staged)
+        paths.add(staged.path)
+    assert len(paths) == 1
+    assert paths.pop().endswith(".png")
+    assert os.listdir(tmp_path) == [f"{staged.content_hash}.png"]
+
+
+def test_extension_comes_from_the_detected_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(gallery_images, "GALLERY_DIR", str(tmp_path))
+    out = io.BytesIO()
+    Image.new("RGB", (4, 4)).save(out, "JPEG")
+    assert stage_upload(io.BytesIO(out.getvalue())).path.endswith(".jpg")
+    assert not os.path.splitext(stage_upload(io.BytesIO(b"not an image")).path)[1]
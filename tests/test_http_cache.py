@@ -0,0 +1,31 @@
+import pytest
+
+from services.http_cache import RangeNotSatisfiable, _if_range_matches, parse_range
+
+
+def test_parse_range_forms():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=0-999", 100) == (0, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=-0", "bytes=5-2"])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, 100)
+
+
+@pytest.mark.parametrize("header", ["bytes=-5", "bytes=0-", "bytes=0-0"])
+def test_parse_range_empty_document(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, 0)
+
+
+def test_if_range_needs_a_strong_match():
+    assert _if_range_matches('"abc"', '"abc"')
+    assert not _if_range_matches('W/"1-10-0"', 'W/"1-10-0"')
+    assert not _if_range_matches('"abc"', '"abd"')
+    assert not _if_range_matches("Wed, 21 Oct 2026 07:28:00 GMT", '"abc"')
@@ -0,0 +1,32 @@
+from services.matching import CandidateFeatures, CandidateMatrix, Vacancy, tokenize_skills
+
+MULTI_WORD = "Forklift driving, Data entry, Elderly care, Truck driving, Customer service, Food safety, Stock control, Team leading"
+
+
+def test_tokenize_skills_keeps_phrases():
+    assert tokenize_skills("Forklift  driving, Python;python") == ["forklift driving", "python"]
+    assert tokenize_skills(None) == []
+
+
+def test_skills_past_the_initial_width_still_match():
+    matrix = CandidateMatrix(skill_columns=4)
+    matrix.load([
+        CandidateFeatures(1, MULTI_WORD + ", Python", 0, None, None),
+        CandidateFeatures(2, "Cooking", 0, None, None),
+    ])
+    ranked = matrix.top_k(Vacancy(["Python"]), 10)
+    assert [user_id for user_id, _ in ranked] == [1]
+    assert matrix.matched_skills(1, Vacancy(["Python", "Welding"])) == ["Python"]
+
+
+def test_candidates_without_any_skill_are_not_ranked():
+    matrix = CandidateMatrix()
+    matrix.load([
+        CandidateFeatures(1, "Welding", 10, "Germany", "Berlin"),
+        CandidateFeatures(2, "Cooking", 10, "Germany", "Berlin"),
+        CandidateFeatures(3, "Welding, Cooking", 0, None, None),
+    ])
+    ranked = matrix.top_k(Vacancy(["Welding"], 5, "Germany", "Berlin"), 10)
+    assert [user_id for user_id, _ in ranked] == [1, 3]
+    # Without required skills everyone is ranked on experience and location
+    assert len(matrix.top_k(Vacancy([], 5, "Germany"), 10)) == 3
@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from services.metrics import MetricsMiddleware
+
+
+def call(app, headers):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "method": "POST", "path": "/", "raw_path": b"/", "root_path": "",
+        "query_string": b"", "headers": headers, "scheme": "http", "server": ("test", 80),
+        "http_version": "1.1",
+    }
+    asyncio.run(app(scope, receive, send))
+    return messages[0]["status"]
+
+
+@pytest.mark.parametrize("length", [b"abc", b"", b"-5", b"12"])
+def test_content_length_never_breaks_the_request(length):
+    inner = Starlette(routes=[Route("/", lambda request: PlainTextResponse("ok"), methods=["POST"])])
+    app = MetricsMiddleware(inner, inner.router)
+    assert call(app, [(b"content-length", length)]) == 200
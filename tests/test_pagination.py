@@ -0,0 +1,32 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from models import Booking
+from services.pagination import decode_cursor, encode_cursor, keyset_page
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor([date(2026, 1, 2), 7])) == ["2026-01-02", 7]
+
+
+@pytest.mark.parametrize("values", [
+    ["2026-01-02", "7"],
+    ["2026-01-02", 7.5],
+    ["2026-01-02", True],
+    ["2026-01-02", None],
+    [7, 7],
+])
+def test_keyset_page_rejects_crafted_cursors(values):
+    # Rejected before any query runs, so no session is needed
+    with pytest.raises(HTTPException) as raised:
+        keyset_page(None, Booking, ["id"], [], Booking.date, encode_cursor(values), 10, date.fromisoformat)
+    assert raised.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor(["2026-01-02"]), encode_cursor({"a": 1})])
+def test_decode_cursor_rejects_malformed(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor)
+    assert raised.value.status_code == 400
@@ -0,0 +1,110 @@
+"""Worker startup must stay fast: `import main`, the lifespan and the first requests.
+
+Everything runs in fresh interpreters. The import checks replace the DBAPI
+connect functions, so they need no database; the lifespan check boots the app
+against TEST_DATABASE_URL and is skipped without it. Budgets are about 1.5x
+the measured baseline; benchmarks/startup.py has the fuller measurements.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+# `import main` measures ~2 s
+IMPORT_BUDGET_MS = float(os.environ.get("TEST_IMPORT_BUDGET_MS", 3000))
+# Lifespan until the first /health answer, and the first request that queries the database
+READY_BUDGET_MS = float(os.environ.get("TEST_READY_BUDGET_MS", 2000))
+FIRST_REQUEST_BUDGET_MS = float(os.environ.get("TEST_FIRST_REQUEST_BUDGET_MS", 500))
+
+IMPORT_SNIPPET = """
+import json, time
+import asyncpg, psycopg2
+
+opened = []
+
+def refuse(*args, **kwargs):
+    opened.append(1)
+    raise RuntimeError("database connection opened while importing main")
+
+psycopg2.connect = asyncpg.connect = refuse
+start = time.perf_counter()
+import main
+seconds = time.perf_counter() - start
+
+import database
+pools = [database.engine.pool, database.async_engine.sync_engine.pool]
+if database.replica_engine is not None:
+    pools.append(database.replica_engine.pool)
+print(json.dumps({
+    "seconds": seconds,
+    "connects": len(opened),
+    "pooled": sum(pool.checkedin() + pool.checkedout() for pool in pools if hasattr(pool, "checkedin")),
+}))
+"""
+
+
+BOOT_SNIPPET = """
+import json, time
+from datetime import date
+from starlette.testclient import TestClient
+import main
+
+started = time.perf_counter()
+with TestClient(main.app) as client:  # runs the lifespan
+    client.get("/health").raise_for_status()
+    ready = time.perf_counter() - started
+    started = time.perf_counter()
+    client.get("/api/customer/availability", params={"date_from": date.today().isoformat()}).raise_for_status()
+    first_request = time.perf_counter() - started
+print(json.dumps({"ready": ready, "first_request": first_request}))
+"""
+
+
+def run_snippet(snippet: str, env: dict = None) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", snippet], cwd=ROOT, check=True, capture_output=True, text=True, env=env
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def import_main() -> dict:
+    return run_snippet(IMPORT_SNIPPET)
+
+
+def test_import_opens_no_database_connection():
+    result = import_main()
+    assert result["connects"] == 0
+    assert result["pooled"] == 0
+
+
+def test_import_time_within_budget():
+    # Best of two runs, so one slow cold start does not fail the build
+    best_ms = min(import_main()["seconds"] for _ in range(2)) * 1000
+    assert best_ms <= IMPORT_BUDGET_MS, f"import main took {best_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+def test_boot_and_first_requests_within_budget():
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+    command.upgrade(config, "head")
+
+    result = run_snippet(BOOT_SNIPPET, env={
+        **os.environ,
+        "DATABASE_URL": DATABASE_URL,
+        "RUN_MIGRATIONS_ON_STARTUP": "false",
+        "NOTIFICATION_WORKER_IN_PROCESS": "false",
+    })
+    ready_ms = result["ready"] * 1000
+    first_ms = result["first_request"] * 1000
+    assert ready_ms <= READY_BUDGET_MS, f"first /health after {ready_ms:.0f} ms (budget {READY_BUDGET_MS:.0f} ms)"
+    assert first_ms <= FIRST_REQUEST_BUDGET_MS, \
+        f"first database request took {first_ms:.0f} ms (budget {FIRST_REQUEST_BUDGET_MS:.0f} ms)"